@@ -4,10 +4,18 @@
 
 """
 
+import atexit
+from collections import namedtuple
+import functools
+import os
 import sqlite3
+import sys
+import threading
+import time
 from typing import Final, Optional, Union
-import unicodedata
-from flask import Flask, g, redirect, render_template, request, url_for
+from flask import (Flask, redirect, render_template, request,
+                   stream_template, url_for)
+from jinja2 import FileSystemBytecodeCache
 from werkzeug import Response
 
 # データベースのファイル名
@@ -16,7 +24,34 @@ DATABASE: Final[str] = 'discography.db'
 # Flask クラスのインスタンス
 app = Flask(__name__)
 
+# Jinja テンプレートのコンパイル結果をディスクにも保存する
+# （プロセスの再起動や複数ワーカー間で初回コンパイルを共有できる）
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+
+# ワーカースレッドごとのデータベース接続置き場
+# （リクエストごとに開閉せず、スレッドの生存期間中は同じ接続を使い回す）
+_local: Final[threading.local] = threading.local()
+
+# 生成した全接続の一覧（プロセス終了時にまとめて閉じるため）
+_all_connections: Final[list[sqlite3.Connection]] = []
+_all_connections_lock: Final[threading.Lock] = threading.Lock()
+
+
+@atexit.register
+def _close_all_connections() -> None:
+    """プロセス終了時に使い回していた接続をすべて閉じる."""
+    with _all_connections_lock:
+        for con in _all_connections:
+            try:
+                # 集めた統計で必要なら ANALYZE を差分実行してから閉じる
+                con.execute('PRAGMA optimize')
+                con.close()
+            except sqlite3.Error:
+                pass
+        _all_connections.clear()
+
 # 処理結果コードとメッセージ
+# （キーは intern 済み文字列にし、参照時のハッシュ計算を安くする）
 RESULT_MESSAGES: Final[dict[str, str]] = {
     'id-has-invalid-charactor':
     '指定された情報には使えない文字があります - '
@@ -88,48 +123,551 @@ RESULT_MESSAGES: Final[dict[str, str]] = {
 }
 
 
+class _ResultMessages(dict):
+    """未知のコードに 'code error' を返す処理結果メッセージ辞書."""
+
+    def __missing__(self, code: str) -> str:
+        return 'code error'
+
+
+RESULT_MESSAGES = _ResultMessages({sys.intern(code): message
+                                   for code, message in
+                                   RESULT_MESSAGES.items()})
+
+
+def result_message(code: str) -> str:
+    """
+    処理結果コードに対応するメッセージを返す.
+
+    各 *_results ページで散在していた
+    result_message(code) の共通化。
+    URL 由来のコードも intern してキーとポインタ一致で照合できるようにする。
+
+    Args:
+      code (str): 処理結果コード
+    Returns:
+      str: 対応するメッセージ（未知のコードは 'code error'）
+    """
+    return RESULT_MESSAGES[sys.intern(code)]
+
+# SQL 文はリクエストごとに組み立て直さずモジュール定数として一度だけ作る。
+# 同一の文字列オブジェクトを渡し続けることで sqlite3 の文キャッシュ
+# （cached_statements）が効き、SQL の再パースを避けられる。
+# cd
+# 一覧テンプレートが参照する列だけを取り出す
+# （issued_date は並び順にのみ使うため取り出さない）
+SQL_SELECT_CDS_PAGE: Final[str] = \
+    'SELECT id, title, series_name, order_in_series FROM cds ' \
+    'ORDER BY issued_date LIMIT ? OFFSET ?'
+
+# CD 一覧 1 ページあたりの表示件数
+CDS_PAGE_SIZE: Final[int] = 100
+SQL_SELECT_CDS_BY_TITLE: Final[str] = \
+    'SELECT id, title, series_name, order_in_series FROM cds ' \
+    'WHERE title LIKE ? ORDER BY issued_date'
+SQL_SELECT_CD_BY_ID: Final[str] = 'SELECT * FROM cds WHERE id = ?'
+SQL_SELECT_CD_ID_TITLE: Final[str] = \
+    'SELECT id, title FROM cds WHERE id = ?'
+# GROUP BY / ORDER BY は駆動表 tracks_artists の主キー列を指す。
+# 主キー索引の走査順がそのままグループ順になり、一時 B-tree を作らずに済む
+SQL_SELECT_CD_TRACKS: Final[str] = \
+    'SELECT t.track_number, s.title, ' \
+    'GROUP_CONCAT(a.name, ", ") AS artists, s.id AS song_id ' \
+    'FROM tracks t ' \
+    'JOIN songs s ON s.id = t.song_id ' \
+    'JOIN tracks_artists ta ON ta.cd_id = t.cd_id ' \
+    'AND ta.track_number = t.track_number ' \
+    'JOIN artists a ON a.id = ta.artist_id ' \
+    'WHERE t.cd_id = ? ' \
+    'GROUP BY ta.track_number ' \
+    'ORDER BY ta.track_number '
+SQL_SELECT_TRACKS_FOR_EDIT: Final[str] = \
+    'SELECT t.track_number, t.song_id, ta.artist_id ' \
+    'FROM tracks t ' \
+    'JOIN songs s ON s.id = t.song_id ' \
+    'JOIN tracks_artists ta ON ta.cd_id = t.cd_id ' \
+    'AND ta.track_number = t.track_number ' \
+    'JOIN artists a ON a.id = ta.artist_id ' \
+    'WHERE t.cd_id = ? ' \
+    'ORDER BY t.track_number '
+# song
+SQL_SELECT_SONGS_ALL: Final[str] = 'SELECT * FROM songs'
+SQL_SELECT_SONGS_PAGE: Final[str] = 'SELECT * FROM songs LIMIT ? OFFSET ?'
+SQL_SELECT_SONGS_BY_TITLE: Final[str] = \
+    'SELECT * FROM songs WHERE title LIKE ?'
+SQL_SELECT_SONG_BY_ID: Final[str] = 'SELECT * FROM songs WHERE id = ?'
+SQL_SELECT_ARTISTS_ALL: Final[str] = 'SELECT * FROM artists'
+SQL_SELECT_ARTISTS_BY_NAME: Final[str] = \
+    'SELECT * FROM artists WHERE name LIKE ?'
+SQL_SELECT_ARTIST_BY_ID: Final[str] = 'SELECT * FROM artists WHERE id = ?'
+SQL_SELECT_CONCERT_BY_ID: Final[str] = 'SELECT * FROM concerts WHERE id = ?'
+SQL_SELECT_CONCERTS_ALL: Final[str] = \
+    'SELECT * FROM concerts ORDER BY held_date'
+SQL_SELECT_CONCERTS_BY_TITLE: Final[str] = \
+    'SELECT * FROM concerts WHERE title LIKE ? ORDER BY held_date'
+# 削除確認ページはアーティスト名しか表示しないため列を絞る
+SQL_SELECT_ARTIST_ID_NAME: Final[str] = \
+    'SELECT id, name FROM artists WHERE id = ?'
+# 削除確認ページはコンサートタイトルしか表示しないため列を絞る
+SQL_SELECT_CONCERT_ID_TITLE: Final[str] = \
+    'SELECT id, title FROM concerts WHERE id = ?'
+# トラック追加前の 3 つの存在チェックを 1 クエリにまとめたもの
+SQL_TRACK_ADD_CHECKS: Final[str] = \
+    'SELECT EXISTS(SELECT 1 FROM tracks ' \
+    'WHERE cd_id = ? AND track_number = ?), ' \
+    'EXISTS(SELECT 1 FROM songs WHERE id = ?), ' \
+    'EXISTS(SELECT 1 FROM artists WHERE id = ?)'
+# セットリスト追加前の 3 つの存在チェックを 1 クエリにまとめたもの
+SQL_SETLIST_ADD_CHECKS: Final[str] = \
+    'SELECT EXISTS(SELECT 1 FROM performances ' \
+    'WHERE concert_id = ? AND number_of_order = ?), ' \
+    'EXISTS(SELECT 1 FROM songs WHERE id = ?), ' \
+    'EXISTS(SELECT 1 FROM artists WHERE id = ?)'
+# artist / concert
+# DISTINCT 付きの結合は重複除去の一時 B-tree を作るため、
+# EXISTS の相関副問い合わせに書き換えて CD / コンサートごとに
+# 最初の一致で打ち切れるようにする
+SQL_SELECT_ARTIST_CDS: Final[str] = \
+    'SELECT c.title AS cd_title, c.id AS cd_id ' \
+    'FROM cds c ' \
+    'WHERE EXISTS (SELECT 1 FROM tracks_artists ta ' \
+    'WHERE ta.artist_id = ? AND ta.cd_id = c.id)'
+SQL_SELECT_ARTIST_CONCERTS: Final[str] = \
+    'SELECT c.title AS concert_title, c.id AS concert_id ' \
+    'FROM concerts c ' \
+    'WHERE EXISTS (SELECT 1 FROM artists_performances ap ' \
+    'WHERE ap.artist_id = ? AND ap.concert_id = c.id)'
+SQL_SELECT_CONCERT_PERFORMANCES: Final[str] = \
+    'SELECT p.number_of_order AS number_of_order, ' \
+    's.title AS song_title, s.id AS song_id, ' \
+    'GROUP_CONCAT(a.name, ", ") AS artists ' \
+    'FROM performances p ' \
+    'JOIN songs s ON s.id = p.song_id ' \
+    'JOIN artists_performances ap ON ap.concert_id = p.concert_id ' \
+    'AND ap.order_in_concert = p.number_of_order ' \
+    'JOIN artists a ON a.id = ap.artist_id ' \
+    'WHERE p.concert_id = ? ' \
+    'GROUP BY ap.order_in_concert ' \
+    'ORDER BY ap.order_in_concert'
+SQL_SELECT_SETLIST_FOR_EDIT: Final[str] = \
+    'SELECT p.number_of_order, p.song_id, ap.artist_id ' \
+    'FROM performances p ' \
+    'JOIN artists_performances ap ON ap.concert_id = p.concert_id ' \
+    'AND ap.order_in_concert = p.number_of_order ' \
+    'WHERE p.concert_id = ? '
+SQL_INSERT_SONG_IF_ABSENT: Final[str] = \
+    'INSERT OR IGNORE INTO songs (id, title) VALUES (?, ?)'
+SQL_SELECT_SONG_CDS: Final[str] = \
+    'SELECT DISTINCT c.title, c.id AS cd_id ' \
+    'FROM cds c ' \
+    'JOIN tracks t ON c.id = t.cd_id ' \
+    'WHERE t.song_id = ? '
+SQL_SELECT_SONG_CONCERTS: Final[str] = \
+    'SELECT DISTINCT c.title, c.id AS concert_id ' \
+    'FROM concerts c ' \
+    'JOIN performances p ON p.concert_id = c.id ' \
+    'JOIN songs s ON s.id = p.song_id ' \
+    'WHERE s.id = ? '
+SQL_UPDATE_CD_WITH_ORDER: Final[str] = \
+    'UPDATE cds SET title = ?, series_name = ?, ' \
+    'order_in_series = ?, issued_date = ? WHERE id = ?'
+SQL_UPDATE_CD_NULL_ORDER: Final[str] = \
+    'UPDATE cds SET title = ?, series_name = ?, ' \
+    'order_in_series = NULL, issued_date = ? WHERE id = ?'
+SQL_INSERT_CD: Final[str] = \
+    'INSERT INTO cds (id, title, series_name, order_in_series, issued_date) ' \
+    'VALUES (?, ?, ?, ?, ?)'
+SQL_DELETE_CD: Final[str] = 'DELETE FROM cds WHERE id = ?'
+SQL_DELETE_TRACKS_BY_CD: Final[str] = 'DELETE FROM tracks WHERE cd_id = ?'
+SQL_DELETE_TRACKS_ARTISTS_BY_CD: Final[str] = \
+    'DELETE FROM tracks_artists WHERE cd_id = ?'
+SQL_SELECT_PERFORMANCE: Final[str] = \
+    'SELECT concert_id, number_of_order FROM performances ' \
+    'WHERE concert_id = ? AND number_of_order = ? '
+SQL_UPDATE_PERFORMANCE_SONG: Final[str] = \
+    'UPDATE performances SET song_id = ? ' \
+    'WHERE concert_id = ? AND number_of_order = ? '
+SQL_UPDATE_PERFORMANCE_ARTIST: Final[str] = \
+    'UPDATE artists_performances SET artist_id = ? ' \
+    'WHERE concert_id = ? AND order_in_concert = ? AND artist_id = ?'
+SQL_DELETE_PERFORMANCE_ARTIST: Final[str] = \
+    'DELETE FROM artists_performances ' \
+    'WHERE concert_id = ? AND order_in_concert = ? AND artist_id = ?'
+SQL_INSERT_PERFORMANCE_ARTIST: Final[str] = \
+    'INSERT OR IGNORE INTO artists_performances ' \
+    '(concert_id, order_in_concert, artist_id) VALUES (?, ?, ?)'
+
+# 検索・結合で使う列のうち、主キーの先頭列でカバーされていないものに
+# 張る索引。IF NOT EXISTS なので何度実行しても安全（冪等）。
+# tracks.cd_id は主キー (cd_id, track_number) の先頭列なので索引不要。
+INDEX_DDL: Final[tuple[str, ...]] = (
+    'CREATE INDEX IF NOT EXISTS idx_tracks_song_id ON tracks(song_id)',
+    # 前方一致 LIKE がスキャンではなく索引を使えるようにする
+    'CREATE INDEX IF NOT EXISTS idx_cds_title ON cds(title COLLATE NOCASE)',
+    # artists_performances の主キーは artist_id が先頭なので、
+    # コンサート側からの参照はこの索引が無いと全表スキャンになる
+    'CREATE INDEX IF NOT EXISTS idx_artists_performances_concert '
+    'ON artists_performances(concert_id, order_in_concert)',
+    # tracks_artists の主キーは cd_id が先頭なので、
+    # アーティスト側からの参照用に逆向きの索引を用意する
+    'CREATE INDEX IF NOT EXISTS idx_tracks_artists_artist '
+    'ON tracks_artists(artist_id, cd_id)',
+    # 楽曲詳細の出演コンサート一覧が performances を
+    # song_id で引くための索引（主キーは concert_id が先頭）
+    'CREATE INDEX IF NOT EXISTS idx_performances_song_id '
+    'ON performances(song_id)',
+    # コンサート一覧の ORDER BY held_date がソートせずに済むようにする
+    'CREATE INDEX IF NOT EXISTS idx_concerts_held_date '
+    'ON concerts(held_date)',
+)
+
+# 索引作成はプロセスで一度だけ実行すればよい
+_indexes_built: bool = False
+
+# journal_mode=WAL はデータベースファイルに永続化される設定なので、
+# プロセス内で一度設定したら以降の接続では PRAGMA 発行を省略する
+_wal_set: bool = False
+
+
 def get_db() -> sqlite3.Connection:
     """
     データベース接続を得る
 
     リクエスト処理中にデータベース接続が必要になったら呼ぶ関数。
 
-    Flask の g にデータベース接続が保存されていたらその接続を返す。
-    そうでなければデータベース接続して g に保存しつつ接続を返す。
+    スレッドローカルに保持している接続があればそれを返す。
+    無ければ（そのスレッドで最初のリクエスト）、
+    データベース接続してスレッドローカルへ保存する。
     その際に、カラム名でフィールドにアクセスできるように設定変更する。
 
+    接続をリクエストごとに開閉するとファイルオープンや PRAGMA 設定の
+    コストを毎回払い、接続内のページキャッシュも捨ててしまうため、
+    スレッドの生存期間中は同じ接続を使い回す。
+
     https://flask.palletsprojects.com/en/3.0.x/patterns/sqlite3/
     のサンプルにある関数を流用し設定変更を追加。
 
     Returns:
       sqlite3.connect: データベース接続
     """
-    db = getattr(g, '_database', None)
+    db = getattr(_local, 'connection', None)
     if db is None:
-        db = g._database = sqlite3.connect(DATABASE)
+        # isolation_level=None で自動コミットモードにし、
+        # 複数文の更新は BEGIN IMMEDIATE で明示的に束ねる
+        # （暗黙トランザクションの遅いロック昇格で SQLITE_BUSY に
+        #   なるのを避け、書き込みロックを先頭で確定させる）
+        # check_same_thread=False は終了フックが別スレッド生まれの接続に
+        # PRAGMA optimize と close を掛けるためで、通常の利用は
+        # 生成したスレッド専用のまま（スレッド間で共有はしない）
+        db = _local.connection = sqlite3.connect(DATABASE,
+                                                  cached_statements=256,
+                                                  isolation_level=None,
+                                                  check_same_thread=False)
         db.execute('PRAGMA foreign_keys = ON')  # 外部キー制約を有効化
+        # 書き込み性能向上のため WAL モードと各種キャッシュ設定を適用する
+        global _wal_set
+        if not _wal_set:
+            # 追記型ジャーナルで fsync を削減（ファイルに永続化される）
+            db.execute('PRAGMA journal_mode = WAL')
+            _wal_set = True
+        db.execute('PRAGMA synchronous = NORMAL')  # WAL では NORMAL で十分安全
+        db.execute('PRAGMA busy_timeout = 30000')  # ロック競合時は最大 30 秒待つ
+        db.execute('PRAGMA temp_store = MEMORY')  # 一時表をメモリに置く
+        db.execute('PRAGMA cache_size = -20000')  # ページキャッシュ 20MB
+        db.execute('PRAGMA mmap_size = 134217728')  # 128MB を mmap で読む
         db.row_factory = sqlite3.Row  # カラム名でアクセスできるよう設定変更
+        if app.debug:
+            # SQL トレースはデバッグ時のみ（本番では呼び出しコストを掛けない）
+            db.set_trace_callback(app.logger.debug)
+        # 足りない索引があれば最初の接続時に一度だけ作る
+        global _indexes_built
+        if not _indexes_built:
+            for ddl in INDEX_DDL:
+                db.execute(ddl)
+            # 統計情報を更新してクエリプランナに索引を選ばせる
+            db.execute('ANALYZE')
+            _indexes_built = True
+        with _all_connections_lock:
+            _all_connections.append(db)
     return db
 
 
 @app.teardown_appcontext
 def close_connection(exception: Optional[BaseException]) -> None:
     """
-    データベース接続を閉じる.
+    リクエスト終了時にデータベース接続を後始末する.
 
     リクエスト処理の終了時に Flask が自動的に呼ぶ関数。
 
-    Flask の g にデータベース接続が保存されていたら閉じる。
+    接続はスレッドローカルに保持して使い回すため閉じない。
+    代わりに、エラーで途中終了したリクエストが未コミットの
+    トランザクションを残さないようにロールバックだけしておく。
 
     https://flask.palletsprojects.com/en/3.0.x/patterns/sqlite3/
-    のサンプルにある関数をそのまま流用。
+    のサンプルにある関数を接続使い回し用に変更。
 
     Args:
       exception (Optional[BaseException]): 未処理の例外
     """
-    db = getattr(g, '_database', None)
+    db = getattr(_local, 'connection', None)
     if db is not None:
-        db.close()
+        db.rollback()
+
+
+# 制御文字（Unicode カテゴリ Cc = U+0000-001F, U+007F-009F）を消す変換表
+# （str.translate は正規表現より前処理が少なく、C 実装の一括走査で済む）
+_CONTROL_CHAR_TABLE: Final[dict[int, None]] = dict.fromkeys(
+    (*range(0x00, 0x20), *range(0x7f, 0xa0)))
+
+# ASCII 文字列用の削除対象バイト列（上の変換表の ASCII の範囲）
+_CONTROL_CHAR_BYTES: Final[bytes] = bytes((*range(0x00, 0x20), 0x7f))
+
+
+def add_cds(con: sqlite3.Connection,
+            rows: list[tuple[str, str, str, Optional[int], str]]) -> None:
+    """
+    複数の CD をまとめて 1 トランザクションで追加する.
+
+    フォームからの 1 件追加も将来の一括インポートもここを通す。
+    executemany と単一トランザクションの組み合わせにより、
+    1 行 1 コミットの最悪パターン（行数分の fsync）を避けられる。
+
+    Args:
+      con (sqlite3.Connection): データベース接続
+      rows: (id, title, series_name, order_in_series, issued_date) のリスト
+    Raises:
+      sqlite3.Error: 挿入に失敗した場合（トランザクションは自動ロールバック）
+    """
+    con.execute('BEGIN IMMEDIATE')
+    try:
+        con.executemany(SQL_INSERT_CD, rows)
+        con.commit()
+    except sqlite3.Error:
+        con.rollback()
+        raise
+
+
+@functools.lru_cache(maxsize=None)
+def render_static_page(template_name: str) -> str:
+    """
+    パラメータを持たない静的なページをレンダリングして返す.
+
+    出力が毎回同一になるテンプレートは Jinja の評価を
+    プロセスにつき一度だけ行い、以降はキャッシュから返す。
+    （テンプレートを編集したらプロセス再起動で反映される）
+
+    Args:
+      template_name (str): テンプレートファイル名
+    Returns:
+      str: ページのコンテンツ
+    """
+    return render_template(template_name)
+
+
+@functools.lru_cache(maxsize=256)
+def search_cds_by_title(pattern: str) -> tuple:
+    """
+    タイトルで絞り込んだ CD 一覧を返す（パターン別キャッシュ付き）.
+
+    同じ絞り込みパターンはページ遷移などで繰り返し送られてくるため、
+    結果をパターンをキーにキャッシュする。
+    cds テーブルを更新する処理が成功したら
+    search_cds_by_title.cache_clear() で破棄すること。
+
+    Args:
+      pattern (str): LIKE に渡す絞り込みパターン
+    Returns:
+      tuple: 該当する CD の行のタプル
+    """
+    return tuple(get_db().execute(SQL_SELECT_CDS_BY_TITLE,
+                                  (pattern,)).fetchall())
+
+
+# 一覧表示用クエリ結果のプロセス内キャッシュ。
+# キーは (SQL, パラメータ, テーブルの版数)。テーブルが更新されると
+# invalidate_table_caches で版数が進み、古いエントリは参照されなくなる。
+QUERY_CACHE_TTL: Final[float] = 30.0  # 秒
+
+
+@functools.lru_cache(maxsize=32)
+def _row_type_for(columns: tuple) -> type:
+    """
+    カラム名の組に対応する namedtuple 型を返す（SQL ごとにキャッシュ）.
+
+    sqlite3.Row への {{ row.title }} は属性参照の失敗を経て
+    __getitem__ にフォールバックするが、namedtuple なら属性参照一発で済む。
+
+    Args:
+      columns (tuple): カーソルの説明情報から取り出したカラム名の組
+    Returns:
+      type: カラム名をフィールドに持つ namedtuple 型
+    """
+    return namedtuple('QueryRow', columns, rename=True)
+_query_cache: Final[dict] = {}
+_query_cache_lock: Final[threading.Lock] = threading.Lock()
+_table_versions: Final[dict[str, int]] = {}
+
+
+def cached_fetchall(sql: str, params: tuple, table: str) -> list:
+    """
+    一覧クエリを実行し、結果をテーブル版数付きでキャッシュする.
+
+    一覧ページは最も頻繁に参照される一方、対象テーブルの更新は
+    本モジュール内の少数のハンドラに限られるため、
+    TTL と更新時の版数繰り上げを組み合わせてキャッシュできる。
+
+    Args:
+      sql (str): 実行する SELECT 文
+      params (tuple): SQL のパラメータ
+      table (str): 結果が依存するテーブル名
+    Returns:
+      list: 行のリスト
+    """
+    key = (sql, params, _table_versions.get(table, 0))
+    now = time.monotonic()
+    with _query_cache_lock:
+        entry = _query_cache.get(key)
+        if entry is not None and now - entry[0] < QUERY_CACHE_TTL:
+            return entry[1]
+    result_cur = get_db().execute(sql, params)
+    row_type = _row_type_for(tuple(d[0] for d in result_cur.description))
+    # 一覧ページのテンプレートは属性参照でセルを読むため、
+    # sqlite3.Row より参照の速い namedtuple に詰め替えてキャッシュする
+    rows = list(map(row_type._make, result_cur.fetchall()))
+    with _query_cache_lock:
+        if len(_query_cache) > 64:
+            # 古い版数のキーが溜まり過ぎないように一掃する
+            _query_cache.clear()
+        _query_cache[key] = (now, rows)
+    return rows
+
+
+def invalidate_table_caches(table: str) -> None:
+    """
+    テーブルを更新した後に呼び、依存するキャッシュを無効化する.
+
+    Args:
+      table (str): 更新したテーブル名
+    """
+    with _query_cache_lock:
+        _table_versions[table] = _table_versions.get(table, 0) + 1
+    if table == 'cds':
+        search_cds_by_title.cache_clear()
+
+
+def table_version(table: str) -> int:
+    """
+    テーブルの現在の版数を返す.
+
+    Args:
+      table (str): テーブル名
+    Returns:
+      int: 版数（更新のたびに繰り上がる）
+    """
+    with _query_cache_lock:
+        return _table_versions.get(table, 0)
+
+
+@functools.lru_cache(maxsize=8)
+def _cds_page_html(version: int, page: int) -> str:
+    """
+    CD 一覧ページの HTML を返す（テーブル版数付きキャッシュ）.
+
+    一覧ページの内容は cds テーブルとページ番号だけで決まるため、
+    版数をキーに含めれば更新までの間レンダリング結果を使い回せる
+    （実体化ビュー方式。更新時に作り直す代わりに版数で自然に失効する）。
+
+    Args:
+      version (int): cds テーブルの版数
+      page (int): 表示するページ番号（0 始まり）
+    Returns:
+      str: ページのコンテンツ
+    """
+    rows = cached_fetchall(SQL_SELECT_CDS_PAGE,
+                           (CDS_PAGE_SIZE + 1, page * CDS_PAGE_SIZE), 'cds')
+    has_next = len(rows) > CDS_PAGE_SIZE
+    return render_template('cds.html', cds=rows[:CDS_PAGE_SIZE],
+                           page=page, has_next=has_next)
+
+
+@functools.lru_cache(maxsize=32)
+def _cds_filtered_html(version: int, pattern: str) -> str:
+    """
+    タイトルで絞り込んだ CD 一覧ページの HTML を返す.
+
+    Args:
+      version (int): cds テーブルの版数
+      pattern (str): 絞り込みパターン
+    Returns:
+      str: ページのコンテンツ
+    """
+    return render_template('cds.html', cds=search_cds_by_title(pattern))
+
+
+@functools.lru_cache(maxsize=8)
+def _songs_page_html(version: int, page: int) -> str:
+    """
+    楽曲一覧ページの HTML を返す（テーブル版数付きキャッシュ）.
+
+    Args:
+      version (int): songs テーブルの版数
+      page (int): 表示するページ番号（0 始まり）
+    Returns:
+      str: ページのコンテンツ
+    """
+    rows = cached_fetchall(SQL_SELECT_SONGS_PAGE,
+                           (CDS_PAGE_SIZE + 1, page * CDS_PAGE_SIZE), 'songs')
+    has_next = len(rows) > CDS_PAGE_SIZE
+    return render_template('songs.html', songs=rows[:CDS_PAGE_SIZE],
+                           page=page, has_next=has_next)
+
+
+@functools.lru_cache(maxsize=64)
+def render_results_page(template_name: str, code: str) -> str:
+    """
+    処理結果ページをレンダリングして返す（(テンプレート, コード) 別キャッシュ）.
+
+    処理結果コードは閉じた集合で、RESULT_MESSAGES は不変なので、
+    同じ組み合わせのレンダリングはプロセスにつき一度で済む。
+
+    Args:
+      template_name (str): テンプレートファイル名
+      code (str): 処理結果コード
+    Returns:
+      str: ページのコンテンツ
+    """
+    return render_template(template_name, results=result_message(code))
+
+
+@functools.lru_cache(maxsize=128)
+def _results_url(endpoint: str, code: str) -> str:
+    """
+    処理結果ページへの URL を返す（(エンドポイント, コード) 別キャッシュ）.
+
+    url_for は呼ぶたびに URL マップを探索するが、処理結果コードは
+    閉じた集合なので、組み合わせごとに一度だけ構築すれば十分。
+
+    Args:
+      endpoint (str): 処理結果ページのエンドポイント名
+      code (str): 処理結果コード
+    Returns:
+      str: 処理結果ページの URL
+    """
+    return url_for(endpoint, code=code)
+
+
+def redirect_results(endpoint: str, code: str) -> Response:
+    """
+    処理結果ページへリダイレクトする.
+
+    Args:
+      endpoint (str): 処理結果ページのエンドポイント名
+      code (str): 処理結果コード
+    Returns:
+      Response: リダイレクトのレスポンス
+    """
+    return redirect(_results_url(endpoint, code))
+
 
 
 def has_control_character(s: str) -> bool:
@@ -141,7 +679,31 @@ def has_control_character(s: str) -> bool:
     Returns:
       bool: 含まれていれば True 含まれていなければ False
     """
-    return any(map(lambda c: unicodedata.category(c) == 'Cc', s))
+    # 制御文字を消す変換を掛け、長さが縮んだら含まれていたと分かる
+    if s.isascii():
+        # ASCII なら bytes.translate の 256 要素表引きでさらに速く走査できる
+        return len(s) != len(s.encode().translate(None, _CONTROL_CHAR_BYTES))
+    return len(s) != len(s.translate(_CONTROL_CHAR_TABLE))
+
+
+def parse_int_fields(form, *names: str) -> Optional[list[int]]:
+    """
+    フォームの複数フィールドをまとめて整数へ変換する.
+
+    各ハンドラがフィールドごとに try/except を並べる代わりに、
+    ここで 1 回の例外フレームだけで全フィールドを変換する。
+
+    Args:
+      form: リクエストのフォームデータ
+      *names (str): 変換対象のフィールド名
+    Returns:
+      Optional[list[int]]: 変換後の値のリスト。
+        変換できない値が 1 つでもあれば None
+    """
+    try:
+        return [int(form[name]) for name in names]
+    except ValueError:
+        return None
 
 # TOPページ
 @app.route('/')
@@ -158,8 +720,8 @@ def index() -> str:
     Returns:
       str: ページのコンテンツ
     """
-    # テンプレートへ何も渡さずにレンダリングしたものを返す
-    return render_template('index.html')
+    # テンプレートへ何も渡さないため、キャッシュ済みのレンダリング結果を返す
+    return render_static_page('index.html')
 
 
 # CD関連ページ
@@ -177,14 +739,15 @@ def cds() -> str:
     Returns:
       str: ページのコンテンツ
     """
-    # データベース接続してカーソルを得る
-    cur = get_db().cursor()
-
-    # cds テーブルの全行から CD の情報を取り出した一覧を取得
-    cds = cur.execute('SELECT * FROM cds ORDER BY issued_date').fetchall()
+    # 表示するページ番号（0 始まり）をクエリ文字列から取得
+    try:
+        page = max(int(request.args.get('page', 0)), 0)
+    except ValueError:
+        page = 0
 
-    # 一覧をテンプレートへ渡してレンダリングしたものを返す
-    return render_template('cds.html', cds=cds)
+    # レンダリング済み HTML を返す
+    # （cds テーブルが更新されるまで再レンダリングは起きない）
+    return _cds_page_html(table_version('cds'), page)
 
 @app.route('/cds', methods=['POST'])
 def cds_filtered() -> str:
@@ -202,16 +765,10 @@ def cds_filtered() -> str:
     Returns:
       str: ページのコンテンツ
     """
-    # データベース接続してカーソルを得る
-    cur = get_db().cursor()
-
-    # cds テーブルからタイトルで絞り込み、
-    # 得られた全行から CD の情報を取り出した一覧を取得
-    cds = cur.execute('SELECT * FROM cds WHERE title LIKE ? ORDER BY issued_date', 
-                      (request.form['title_filter'],)).fetchall()
-
-    # 一覧をテンプレートへ渡してレンダリングしたものを返す
-    return render_template('cds.html', cds=cds)
+    # 絞り込みパターン別にレンダリング済み HTML を返す
+    # （同一パターンの再検索は再レンダリングなしで返る）
+    return _cds_filtered_html(table_version('cds'),
+                              request.form['title_filter'])
 
 @app.route('/cd/<id>')
 def cd(id: str) -> str:
@@ -232,28 +789,20 @@ def cd(id: str) -> str:
     Returns:
       str: ページのコンテンツ
     """
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
     # cds テーブルから指定された CD品番の行を 1 行だけ取り出す
-    cd = cur.execute('SELECT * FROM cds WHERE id = ? ',
+    cd = con.execute(SQL_SELECT_CD_BY_ID,
                      (id,)).fetchone()
 
-    songs = cur.execute('SELECT t.track_number, s.title, GROUP_CONCAT(a.name, ", ") AS artists, s.id AS song_id '
-                        'FROM tracks t '
-                        'JOIN songs s ON s.id = t.song_id '
-                        'JOIN tracks_artists ta ON ta.cd_id = t.cd_id AND ta.track_number = t.track_number '
-                        'JOIN artists a ON a.id = ta.artist_id '
-                        'WHERE t.cd_id = ? '
-                        'GROUP BY t.track_number, s.title '
-                        'ORDER BY t.track_number ',
-                        (id, )).fetchall()
-
     if cd is None:
         # 指定された CD品番の行が無かった
+        # （トラック一覧の集計クエリを実行する前に打ち切る）
         return render_template('cd-not-found.html')
 
+    songs = con.execute(SQL_SELECT_CD_TRACKS, (id, )).fetchall()
+
     # CD の情報をテンプレートへ渡してレンダリングしたものを返す
     return render_template('cd.html', cd=cd, songs=songs)
 
@@ -272,8 +821,8 @@ def cd_add() -> str:
     Returns:
       str: ページのコンテンツ
     """
-    # テンプレートへ何も渡さずにレンダリングしたものを返す
-    return render_template('cd-add.html')
+    # テンプレートへ何も渡さないため、キャッシュ済みのレンダリング結果を返す
+    return render_static_page('cd-add.html')
 
 @app.route('/cd-add', methods=['POST'])
 def cd_add_execute() -> Response:
@@ -293,34 +842,24 @@ def cd_add_execute() -> Response:
     Returns:
       Response: リダイレクト情報
     """
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
     # リクエストされた POST パラメータの内容を取り出す
-    title = request.form['title']
-    id = request.form['id']
-    series_name = request.form['series_name']
-    order_in_series = request.form['order_in_series']
-    issued_date = request.form['issued_date']
-
-    # titleのチェック
-    if has_control_character(title):
-        # 制御文字が含まれる
-        return redirect(url_for('cd_add_results',
-                                code='include-control-charactor'))
-
-    # idのチェック
-    if has_control_character(id):
+    # （request.form のプロキシ解決を 1 回で済ませる）
+    form = request.form
+    title = form['title']
+    id = form['id']
+    series_name = form['series_name']
+    order_in_series = form['order_in_series']
+    issued_date = form['issued_date']
+
+    # title, id, series_name, issued_dateのチェック
+    # （連結して 1 回の走査で済ませる。制御文字は 1 文字単位で
+    #   判定されるため連結しても検出結果は変わらない）
+    if has_control_character(title + id + series_name + issued_date):
         # 制御文字が含まれる
-        return redirect(url_for('cd_add_results',
-                                code='include-control-charactor'))
-
-    # series_nameのチェック
-    if series_name and has_control_character(series_name):
-      # 制御文字が含まれる
-      return redirect(url_for('cd_add_results',
-                  code='include-control-charactor'))
+        return redirect_results('cd_add_results', 'include-control-charactor')
 
     # order_in_seriesのチェック
     if order_in_series:
@@ -329,32 +868,21 @@ def cd_add_execute() -> Response:
         order_in_series = int(order_in_series)
       except ValueError:
         # シリーズ通し番号が整数型へ変換できない
-        return redirect(url_for('cd_add_results',
-                    code='series-number-has-invalid-charactor'))
-
-    # issued_dateのチェック
-    if has_control_character(issued_date):
-        # 制御文字が含まれる
-        return redirect(url_for('cd_add_results',
-                                code='include-control-charactor'))
+        return redirect_results('cd_add_results', 'series-number-has-invalid-charactor')
 
     # データベースへCDを追加
     try:
         # cds テーブルに指定されたパラメータの行を挿入
-        cur.execute('INSERT INTO cds '
-                    '(id, title, series_name, order_in_series, issued_date) '
-                    'VALUES (?, ?, ?, ?, ?)',
-                    (id, title, series_name, order_in_series, issued_date))
+        # （一括追加用ヘルパを 1 件のリストで呼ぶ。コミットも中で行われる）
+        add_cds(con, [(id, title, series_name, order_in_series, issued_date)])
     except sqlite3.Error:
         # データベースエラーが発生
-        return redirect(url_for('cd_add_results',
-                                code='database-error'))
-    # コミット（データベース更新処理を確定）
-    con.commit()
+        return redirect_results('cd_add_results', 'database-error')
+    # cds テーブルが変わったので関連キャッシュを破棄
+    invalidate_table_caches('cds')
 
     # CD追加完了
-    return redirect(url_for('cd_add_results',
-                            code='cd-added'))
+    return redirect_results('cd_add_results', 'cd-added')
 
 @app.route('/cd-add-results/<code>')
 def cd_add_results(code: str) -> str:
@@ -374,8 +902,7 @@ def cd_add_results(code: str) -> str:
 
 
 
-    return render_template('cd-add-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'))
+    return render_results_page('cd-add-results.html', code)
 
 @app.route('/cd-del/<id>')
 def cd_del(id: str) -> str:
@@ -397,16 +924,14 @@ def cd_del(id: str) -> str:
     Returns:
       str: ページのコンテンツ
     """
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
-    try:
-        # CD品番の存在チェックをする：
-        # cds テーブルで同じCD品番の行を 1 行だけ取り出す
-        cd = cur.execute('SELECT * FROM cds WHERE id = ?',
-                         (id,)).fetchone()
-    except cd is None:
+    # CD品番の存在チェックをする：
+    # cds テーブルで同じCD品番の行を 1 行だけ取り出す
+    cd = con.execute(SQL_SELECT_CD_ID_TITLE,
+                     (id,)).fetchone()
+    if cd is None:
         # 指定されたCD品番の行が無い
         return render_template('cd-del-results.html',
                                results='指定されたCD番号は存在しません')
@@ -430,37 +955,34 @@ def cd_del_execute(id: str) -> Response:
     Returns:
       Response: リダイレクト情報
     """
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
-
-    try:
-        # CD品番の存在チェックをする：
-        # cds テーブルで同じCD品番の行を 1 行だけ取り出す
-        cd = cur.execute('SELECT id FROM cds WHERE id = ?',
-                         (id,)).fetchone()
-    except cd is None:
-        # 指定されたCD品番の行が無い
-        return redirect(url_for('cd_del_results',
-                                code='id-does-not-exist'))
 
     # tracks, tracks_artistsからcd_idに指定したCD品番を持つものを削除し、
     # その後cdsから指定したCD品番を持つものを削除
+    # （3 つの DELETE を 1 トランザクションにまとめ、
+    #   コミット＝fsync を 1 回で済ませる。失敗時はロールバック。
+    #   事前の存在チェックはせず、cds の DELETE が 1 行も消さなかったら
+    #   存在しない CD品番 と判断する）
     try:
-        cur.execute('DELETE FROM tracks_artists WHERE cd_id = ?', (id,))
-        cur.execute('DELETE FROM tracks WHERE cd_id = ?', (id,))
-        cur.execute('DELETE FROM cds WHERE id = ?', (id,))
+        con.execute('BEGIN IMMEDIATE')
+        con.execute(SQL_DELETE_TRACKS_ARTISTS_BY_CD, (id,))
+        con.execute(SQL_DELETE_TRACKS_BY_CD, (id,))
+        deleted = con.execute(SQL_DELETE_CD, (id,)).rowcount
+        if deleted == 0:
+            # 指定されたCD品番の行が無い
+            con.rollback()
+            return redirect_results('cd_del_results', 'id-does-not-exist')
+        con.commit()
     except sqlite3.Error:
         # データベースエラーが発生
-        return redirect(url_for('cd_del_results',
-                                code='database-error'))
-
-    # コミット（データベース更新処理を確定）
-    con.commit()
+        con.rollback()
+        return redirect_results('cd_del_results', 'database-error')
+    # cds テーブルが変わったので関連キャッシュを破棄
+    invalidate_table_caches('cds')
 
     # CD削除完了
-    return redirect(url_for('cd_del_results',
-                            code='deleted'))
+    return redirect_results('cd_del_results', 'deleted')
 
 @app.route('/cd-del-results/<code>')
 def cd_del_results(code: str) -> str:
@@ -477,8 +999,7 @@ def cd_del_results(code: str) -> str:
     Returns:
       str: ページのコンテンツ
     """
-    return render_template('cd-del-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'))
+    return render_results_page('cd-del-results.html', code)
 
 @app.route('/cd-edit/<id>')
 def cd_edit(id: str) -> str:
@@ -500,11 +1021,10 @@ def cd_edit(id: str) -> str:
     Returns:
         str: ページのコンテンツ
     """
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
-    cd = cur.execute('SELECT * FROM cds WHERE id = ?',
+    cd = con.execute(SQL_SELECT_CD_BY_ID,
                         (id,)).fetchone()
 
     # 編集対象の CD 情報をテンプレートへ渡してレンダリングしたものを返す
@@ -531,40 +1051,23 @@ def cd_edit_update(id: str) -> Response:
     Returns:
       Response: リダイレクト情報
     """
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
-
-    # CD品番 の存在チェックをする：
-    # cds テーブルで同じ CD品番 の行を 1 行だけ取り出す
-    cd = cur.execute('SELECT id FROM cds WHERE id = ?',
-                           (id,)).fetchone()
-    if cd is None:
-        # 指定された CD品番 の行が無い
-        return redirect(url_for('cd_edit_results',
-                                code='id-does-not-exist'))
 
     # リクエストされた POST パラメータの内容を取り出す
-    title = request.form['title']
-    series_name = request.form['series_name']
-    order_in_series_str = request.form['order_in_series']
-    issued_date = request.form['issued_date']
-
-    if has_control_character(title):
-            # 制御文字が含まれる
-            return redirect(url_for('song_edit_results',
-                                    code='include-control-charactor'))
-
-    if has_control_character(series_name):
-            # 制御文字が含まれる
-            return redirect(url_for('song_edit_results',
-                                    code='include-control-charactor'))
-
-    if has_control_character(issued_date):
-            # 制御文字が含まれる
-            return redirect(url_for('song_edit_results',
-                                    code='include-control-charactor'))
+    # （request.form のプロキシ解決を 1 回で済ませる）
+    form = request.form
+    title = form['title']
+    series_name = form['series_name']
+    order_in_series_str = form['order_in_series']
+    issued_date = form['issued_date']
+
+    # 3 つの入力フィールドを連結して 1 回の走査でチェックする
+    if has_control_character(title + series_name + issued_date):
+        # 制御文字が含まれる
+        return redirect_results('song_edit_results', 'include-control-charactor')
 
+    # シリーズ通し番号の有無で UPDATE 文とパラメータを選ぶ
     if order_in_series_str:
         try:
             # 文字列型で渡されたシリーズ通し番号を整数型へ変換する
@@ -573,41 +1076,32 @@ def cd_edit_update(id: str) -> Response:
             # シリーズ通し番号が整数型へ変換できない
             return render_template('cd-edit-results.html',
                         results='シリーズ通し番号は数値で指定してください')
-        # データベースを更新
-        try:
-        # cds テーブルの指定された行のパラメータを更新
-            cur.execute('UPDATE cds '
-                        'SET title = ?, '
-                        'series_name = ?, '
-                        'order_in_series = ?, '
-                        'issued_date = ? '
-                        'WHERE id = ?',
-                        (title, series_name, order_in_series, issued_date, id))
-        except sqlite3.Error:
-            # データベースエラーが発生
-            return redirect(url_for('cd_edit_results',
-                                    code='database-error'))
+        sql = SQL_UPDATE_CD_WITH_ORDER
+        params = (title, series_name, order_in_series, issued_date, id)
     else:
-        # データベースを更新
-        try:
+        sql = SQL_UPDATE_CD_NULL_ORDER
+        params = (title, series_name, issued_date, id)
+
+    # データベースを更新
+    try:
         # cds テーブルの指定された行のパラメータを更新
-            cur.execute('UPDATE cds '
-                        'SET title = ?, '
-                        'series_name = ?, '
-                        'order_in_series = NULL, '
-                        'issued_date = ? '
-                        'WHERE id = ?',
-                        (title, series_name, issued_date, id))
-        except sqlite3.Error:
-            # データベースエラーが発生
-            return redirect(url_for('cd_edit_results',
-                                    code='database-error'))
+        con.execute('BEGIN IMMEDIATE')
+        cur = con.execute(sql, params)
+    except sqlite3.Error:
+        # データベースエラーが発生
+        return redirect_results('cd_edit_results', 'database-error')
+    if cur.rowcount == 0:
+        # 指定された CD品番 の行が無い（更新対象が存在しなかった）
+        con.rollback()
+        return redirect_results('cd_edit_results', 'id-does-not-exist')
+
     # コミット（データベース更新処理を確定）
     con.commit()
+    # cds テーブルが変わったので関連キャッシュを破棄
+    invalidate_table_caches('cds')
 
     # CD編集完了
-    return redirect(url_for('cd_edit_results',
-                            code='updated'))
+    return redirect_results('cd_edit_results', 'updated')
 
 @app.route('/cd-edit-results/<code>')
 def cd_edit_results(code: str) -> str:
@@ -624,8 +1118,7 @@ def cd_edit_results(code: str) -> str:
     Returns:
       str: ページのコンテンツ
     """
-    return render_template('cd-edit-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'))
+    return render_results_page('cd-edit-results.html', code)
 
 # 楽曲関連ページ
 @app.route('/songs')
@@ -642,14 +1135,15 @@ def songs() -> str:
     Returns:
       str: ページのコンテンツ
     """
-    # データベース接続してカーソルを得る
-    cur = get_db().cursor()
-
-    # songs テーブルの全行から楽曲の情報を取り出した一覧を取得
-    songs = cur.execute('SELECT * FROM songs').fetchall()
+    # 表示するページ番号（0 始まり）をクエリ文字列から取得
+    try:
+        page = max(int(request.args.get('page', 0)), 0)
+    except ValueError:
+        page = 0
 
-    # 一覧をテンプレートへ渡してレンダリングしたものを返す
-    return render_template('songs.html', songs=songs)
+    # レンダリング済み HTML を返す
+    # （songs テーブルが更新されるまで再レンダリングは起きない）
+    return _songs_page_html(table_version('songs'), page)
 
 @app.route('/songs', methods=['POST'])
 def songs_filtered() -> str:
@@ -667,15 +1161,16 @@ def songs_filtered() -> str:
     Returns:
       str: ページのコンテンツ
     """
-    # データベース接続してカーソルを得る
-    cur = get_db().cursor()
+    # データベース接続を得る
+    con = get_db()
 
     # songs テーブルからタイトルで絞り込み、
     # 得られた全行から 楽曲 の情報を取り出した一覧を取得
-    songs = cur.execute('SELECT * FROM songs WHERE title LIKE ?', (request.form['title_filter'],)).fetchall()
+    songs = cached_fetchall(SQL_SELECT_SONGS_BY_TITLE,
+                            (request.form['title_filter'],), 'songs')
 
-    # 一覧をテンプレートへ渡してレンダリングしたものを返す
-    return render_template('songs.html', songs=songs)
+    # 一覧をテンプレートへ渡し、レンダリング結果をストリーミングして返す
+    return stream_template('songs.html', songs=songs)
 
 @app.route('/song/<id>')
 def song(id: str) -> str:
@@ -696,27 +1191,15 @@ def song(id: str) -> str:
     Returns:
       str: ページのコンテンツ
     """
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
     # songs テーブルから指定された song_id の行を 1 行だけ取り出す
-    song = cur.execute('SELECT * FROM songs WHERE id = ?', (id,)).fetchone()
-
-    cds = cur.execute(
-        'SELECT DISTINCT c.title, c.id AS cd_id '
-        'FROM cds c '
-        'JOIN tracks t ON c.id = t.cd_id '
-        'WHERE t.song_id = ? '
-        , (id,)).fetchall()
-
-    concerts = cur.execute(
-        'SELECT DISTINCT c.title, c.id AS concert_id '
-        'FROM concerts c '
-        'JOIN performances p ON p.concert_id = c.id '
-        'JOIN songs s ON s.id = p.song_id '
-        'WHERE s.id = ? '
-        , (id,)).fetchall()
+    song = con.execute(SQL_SELECT_SONG_BY_ID, (id,)).fetchone()
+
+    cds = con.execute(SQL_SELECT_SONG_CDS, (id,)).fetchall()
+
+    concerts = con.execute(SQL_SELECT_SONG_CONCERTS, (id,)).fetchall()
 
     if song is None:
         # 指定された song_id の行が無かった
@@ -740,56 +1223,49 @@ def song_add() -> str:
     Returns:
       str: ページのコンテンツ
     """
-    # テンプレートへ何も渡さずにレンダリングしたものを返す
-    return render_template('song-add.html')
+    # テンプレートへ何も渡さないため、キャッシュ済みのレンダリング結果を返す
+    return render_static_page('song-add.html')
 
 @app.route('/song-add', methods=['POST'])
 def song_add_execute() -> Response:
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
     # リクエストされた POST パラメータの内容を取り出す
-    id_str = request.form['id']
-    title = request.form['title']
+    # （request.form のプロキシ解決を 1 回で済ませる）
+    form = request.form
+    id_str = form['id']
+    title = form['title']
 
     try:
     # 文字列型で渡されたIDを整数型へ変換する
         id = int(id_str)
     except ValueError:
     # 楽曲IDが整数型へ変換できない
-        return redirect(url_for('song_add_results',
-                code='id-has-invalid-charactor'))
-
-    song = cur.execute('SELECT id FROM songs WHERE id = ?',\
-                           (id,)).fetchone()
-    if song is not None:
-        # 指定されたIDの行が既に存在
-        return redirect(url_for('song_add_results',
-                                code='id-already-exists'))
+        return redirect_results('song_add_results', 'id-has-invalid-charactor')
+
     # タイトルチェック
     if has_control_character(title):
         # 制御文字が含まれる
-        return redirect(url_for('song_add_results',
-                                code='include-control-charactor'))
+        return redirect_results('song_add_results', 'include-control-charactor')
 
     # データベースへ楽曲を追加
+    # （INSERT OR IGNORE なら存在チェックと挿入が 1 文で済み、
+    #   SELECT と INSERT の間に別リクエストが割り込む余地も無い）
     try:
-        # songs テーブルに指定されたパラメータの行を挿入
-        cur.execute('INSERT INTO songs '
-                    '(id, title) '
-                    'VALUES (?, ?)',
-                    (id, title))
+        cur = con.execute(SQL_INSERT_SONG_IF_ABSENT, (id, title))
     except sqlite3.Error:
         # データベースエラーが発生
-        return redirect(url_for('song_add_results',
-                                code='database-error'))
-    # コミット（データベース更新処理を確定）
-    con.commit()
+        return redirect_results('song_add_results', 'database-error')
+    if cur.rowcount == 0:
+        # 指定されたIDの行が既に存在（IGNORE で何も挿入されなかった）
+        return redirect_results('song_add_results', 'id-already-exists')
+
+    # songs テーブルが変わったので関連キャッシュを破棄
+    invalidate_table_caches('songs')
 
     # 楽曲追加完了
-    return redirect(url_for('song_add_results',
-                            code='song-added'))
+    return redirect_results('song_add_results', 'song-added')
 
 @app.route('/song-add-results/<code>')
 def song_add_results(code: str) -> str:
@@ -806,59 +1282,45 @@ def song_add_results(code: str) -> str:
     Returns:
       str: ページのコンテンツ
     """
-    return render_template('song-add-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'))
+    return render_results_page('song-add-results.html', code)
 
-@app.route('/song-del/<id>')
-def song_del(id: str) -> str:
-    # データベース接続してカーソルを得る
+@app.route('/song-del/<int:id>')
+def song_del(id: int) -> str:
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
-    id = int(id)
-
-    try:
-        # 楽曲IDの存在チェックをする：
-        # songs テーブルで同じ楽曲IDの行を 1 行だけ取り出す
-        song = cur.execute('SELECT * FROM songs WHERE id = ?',
-                         (id,)).fetchone()
-    except song is None:
+    # 楽曲IDの存在チェックをする：
+    # songs テーブルで同じ楽曲IDの行を 1 行だけ取り出す
+    song = con.execute(SQL_SELECT_SONG_BY_ID,
+                     (id,)).fetchone()
+    if song is None:
         # 指定された楽曲IDの行が無い
         return render_template('song-del-results.html',
                                results='指定された楽曲は存在しません')
 
     return render_template('song-del.html', id=id, song=song)
 
-@app.route('/song-del/<id>', methods=['POST'])
-def song_del_execute(id: str) -> Response:
-    # データベース接続してカーソルを得る
+@app.route('/song-del/<int:id>', methods=['POST'])
+def song_del_execute(id: int) -> Response:
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
-
-    try:
-        # 楽曲IDの存在チェックをする：
-        # songs テーブルで同じ楽曲IDの行を 1 行だけ取り出す
-        song = cur.execute('SELECT id FROM songs WHERE id = ?',
-                         (id,)).fetchone()
-    except song is None:
-        # 指定された楽曲IDの行が無い
-        return redirect(url_for('song_del_results',
-                                code='id-does-not-exist'))
 
     try:
         # songs テーブルの指定された行を削除
-        cur.execute('DELETE FROM songs WHERE id = ?', (id,))
+        # （事前の存在チェックはせず rowcount で判定する）
+        cur = con.execute('DELETE FROM songs WHERE id = ?', (id,))
     except sqlite3.Error:
         # データベースエラーが発生
-        return redirect(url_for('song_del_results',
-                                code='database-error'))
+        return redirect_results('song_del_results', 'database-error')
+    if cur.rowcount == 0:
+        # 指定された楽曲IDの行が無い
+        return redirect_results('song_del_results', 'id-does-not-exist')
 
-    # コミット
-    con.commit()
+    # songs テーブルが変わったので関連キャッシュを破棄
+    invalidate_table_caches('songs')
 
     # 楽曲削除完了
-    return redirect(url_for('song_del_results',
-                            code='deleted'))
+    return redirect_results('song_del_results', 'deleted')
 
 @app.route('/song-del-results/<code>')
 def song_del_results(code: str) -> str:
@@ -875,34 +1337,22 @@ def song_del_results(code: str) -> str:
     Returns:
       str: ページのコンテンツ
     """
-    return render_template('song-del-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'))
+    return render_results_page('song-del-results.html', code)
 
 @app.route('/song-edit/<id>')
 def song_edit(id: str) -> str:
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
-    song = cur.execute('SELECT * FROM songs WHERE id = ?',
+    song = con.execute(SQL_SELECT_SONG_BY_ID,
                         (id,)).fetchone()
 
     return render_template('song-edit.html', song=song)
 
 @app.route('/song-edit/<id>', methods=['POST'])
 def song_edit_update(id: str) -> Response:
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
-
-    # 楽曲IDの存在チェックをする：
-    # songs テーブルで同じ楽曲IDの行を 1 行だけ取り出す
-    song = cur.execute('SELECT id FROM songs WHERE id = ?',
-                         (id,)).fetchone()
-    if song is None:
-        # 指定された楽曲IDの行が無い
-        return redirect(url_for('song_edit_results',
-                                code='id-does-not-exist'))
 
     # リクエストされた POST パラメータの内容を取り出す
     title = request.form['title']
@@ -910,56 +1360,62 @@ def song_edit_update(id: str) -> Response:
     # タイトルのチェック
     if has_control_character(title):
         # 制御文字が含まれる
-        return redirect(url_for('song_edit_results',
-                                code='include-control-charactor'))
+        return redirect_results('song_edit_results', 'include-control-charactor')
 
     # データベースを更新
     try:
         # songs テーブルの指定された行のパラメータを更新
-        cur.execute('UPDATE songs '
+        cur = con.execute('UPDATE songs '
                     'SET title = ? '
                     'WHERE id = ?',
                     (title, id))
     except sqlite3.Error:
         # データベースエラーが発生
-        return redirect(url_for('song_edit_results',
-                                code='database-error'))
-    # コミット（データベース更新処理を確定）
-    con.commit()
+        return redirect_results('song_edit_results', 'database-error')
+    if cur.rowcount == 0:
+        # 指定された楽曲IDの行が無い（更新対象が存在しなかった）
+        return redirect_results('song_edit_results', 'id-does-not-exist')
+
+    # songs テーブルが変わったので関連キャッシュを破棄
+    invalidate_table_caches('songs')
 
     # 楽曲編集完了
-    return redirect(url_for('song_edit_results',
-                            code='updated'))
+    return redirect_results('song_edit_results', 'updated')
 
 @app.route('/song-edit-results/<code>')
 def song_edit_results(code: str) -> str:
-    return render_template('song-edit-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'))
+    return render_results_page('song-edit-results.html', code)
 
 # トラック関連ページ
 @app.route('/track-add/<id>')
 def track_add(id: str) -> str:
     con = get_db()
-    cur = con.cursor()
 
-    # CD タイトルを取得
-    cd = cur.execute('SELECT * FROM cds WHERE id = ?', (id,)).fetchone()
-    songs = cur.execute('SELECT * FROM songs').fetchall()
-    artists = cur.execute('SELECT * FROM artists').fetchall()
+    # 3 つの SELECT を 1 つの読み取りトランザクションにまとめ、
+    # 文ごとのロック取得を省きつつ同一スナップショットの一覧を得る
+    con.execute('BEGIN DEFERRED')
+    try:
+        # CD タイトルを取得
+        cd = con.execute(SQL_SELECT_CD_BY_ID, (id,)).fetchone()
+        songs = cached_fetchall(SQL_SELECT_SONGS_ALL, (), 'songs')
+        artists = cached_fetchall(SQL_SELECT_ARTISTS_ALL, (), 'artists')
+    finally:
+        con.commit()
 
     return render_template('track-add.html', cd=cd, songs=songs, artists=artists)
 
 @app.route('/track-add/<id>', methods=['POST'])
 def track_add_execute(id: str) -> Response:
-     # データベース接続してカーソルを得る
+     # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
     # リクエストされた POST パラメータの内容を取り出す
+    # （request.form のプロキシ解決を 1 回で済ませる）
+    form = request.form
     cd_id = id
-    track_number_str = request.form['track_number']
-    song_id_str = request.form['song_id']
-    artist_id_str = request.form['artist_id']
+    track_number_str = form['track_number']
+    song_id_str = form['song_id']
+    artist_id_str = form['artist_id']
 
     try:
         # 文字列型で渡されたシリーズ通し番号を整数型へ変換する
@@ -969,14 +1425,6 @@ def track_add_execute(id: str) -> Response:
         return redirect(url_for('track_add_results',
                     code='track-number-has-invalid-charactor', cd_id=cd_id))
 
-    check_same_track_number = cur.execute('SELECT * FROM tracks WHERE cd_id = ? AND track_number = ?',
-        (cd_id, track_number)).fetchall()
-
-    if len(check_same_track_number) > 0:
-        return redirect(url_for('track_add_results',
-                    code='add-artist-from-tracks-edit-page', cd_id=cd_id))
-
-
     try:
         # 文字列型で渡されたシリーズ通し番号を整数型へ変換する
         song_id = int(song_id_str)
@@ -992,27 +1440,29 @@ def track_add_execute(id: str) -> Response:
         return redirect(url_for('track_add_results',
                     code='artist-id-has-invalid-charactor', cd_id=cd_id))
 
-    # 楽曲IDの存在チェックをする：
-    # songs テーブルで同じ楽曲IDの行を 1 行だけ取り出す
-    song = cur.execute('SELECT id FROM songs WHERE id = ?',
-                         (song_id,)).fetchone()
-    if song is None:
+    # トラック番号の重複・楽曲ID・アーティストIDの存在チェックを
+    # 1 クエリでまとめて行う（3 回の往復を 1 回に減らせる）
+    (track_exists, song_exists, artist_exists) = con.execute(
+        SQL_TRACK_ADD_CHECKS,
+        (cd_id, track_number, song_id, artist_id)).fetchone()
+    if track_exists:
+        # 同じトラック番号の行が既にある
+        return redirect(url_for('track_add_results',
+                    code='add-artist-from-tracks-edit-page', cd_id=cd_id))
+    if not song_exists:
         # 指定された楽曲IDの行が無い
         return redirect(url_for('track_add_results',
                                 code='song-does-not-exist', cd_id=cd_id))
-
-    # アーティストIDの存在チェックをする：
-    # artists テーブルで同じ楽曲IDの行を 1 行だけ取り出す
-    artist = cur.execute('SELECT id FROM artists WHERE id = ?',
-                         (artist_id,)).fetchone()
-    if artist is None:
-        # 指定された楽曲IDの行が無い
+    if not artist_exists:
+        # 指定されたアーティストIDの行が無い
         return redirect(url_for('track_add_results',
                                 code='artist-does-not-exist', cd_id=cd_id))
 
     try:
+        # 2 つの INSERT を 1 トランザクションで実行する
+        con.execute('BEGIN IMMEDIATE')
         # tracks テーブルの指定された行のパラメータを更新
-        cur.execute(
+        con.execute(
                     'INSERT INTO tracks '
                     '(cd_id, track_number, song_id) '
                     'VALUES (?, ?, ?) ',
@@ -1023,7 +1473,7 @@ def track_add_execute(id: str) -> Response:
 
     try:
         # tracks_artists テーブルの指定された行のパラメータを更新
-        cur.execute(
+        con.execute(
                     'INSERT INTO tracks_artists '
                     '(cd_id, track_number, artist_id) '
                     'VALUES (?, ?, ?) ',
@@ -1041,7 +1491,7 @@ def track_add_execute(id: str) -> Response:
 @app.route('/track-add-results/<code>/<cd_id>')
 def track_add_results(code: str, cd_id:str) -> str:
     return render_template('track-add-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'), cd_id=cd_id)
+                           results=result_message(code), cd_id=cd_id)
 
 @app.route('/tracks-del/<id>')
 def tracks_del(id: str) -> str:
@@ -1054,23 +1504,23 @@ def tracks_del(id: str) -> str:
     Returns:
       str: ページのコンテンツ
     """
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
 
     # CD番号の存在チェックをする：
-    # cds テーブルで同じCD番号の行を 1 行だけ取り出す
-    cd = cur.execute('SELECT * FROM cds WHERE id = ?',
-                        (id,)).fetchone()
+    # 確認ページはタイトルしか表示しないため列を絞って 1 行だけ取り出す
+    cd = con.execute(SQL_SELECT_CD_ID_TITLE,
+                     (id,)).fetchone()
     if cd is None:
         # 指定されたCD番号の行が無い
         return render_template('tracks-del-results.html',
                                results='指定されたCDは存在しません', cd_id=id)
 
-    tracks = cur.execute('SELECT * FROM tracks WHERE cd_id = ?',
-                        (id,)).fetchall()
-    if len(tracks) == 0:
+    # トラックの有無だけ確認する（行を取り出す必要は無い）
+    track = con.execute('SELECT 1 FROM tracks WHERE cd_id = ? LIMIT 1',
+                        (id,)).fetchone()
+    if track is None:
         # 指定されたCD番号の行が無い
         return render_template('tracks-del-results.html',
                                results='CDにトラックが存在しません', cd_id=id)
@@ -1085,14 +1535,15 @@ def tracks_del_execute(id: str) -> Response:
     Returns:
       Response: リダイレクト情報
     """
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
     # tracks_artists, tracksからtracks_cd_idに指定したCD品番を持つものを削除
+    # （2 つの DELETE を 1 トランザクションで実行する）
     try:
-        cur.execute('DELETE FROM tracks_artists WHERE cd_id = ?', (id,))
-        cur.execute('DELETE FROM tracks WHERE cd_id = ?', (id,))
+        con.execute('BEGIN IMMEDIATE')
+        con.execute(SQL_DELETE_TRACKS_ARTISTS_BY_CD, (id,))
+        con.execute(SQL_DELETE_TRACKS_BY_CD, (id,))
     except sqlite3.Error:
         # データベースエラーが発生
         return redirect(url_for('tracks_del_results',
@@ -1121,38 +1572,34 @@ def tracks_del_results(code: str, cd_id: str) -> str:
       str: ページのコンテンツ
     """
     return render_template('tracks-del-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'), cd_id=cd_id)
+                           results=result_message(code), cd_id=cd_id)
 
 @app.route('/tracks-edit/<id>')
 def tracks_edit(id: str) -> str:
     con = get_db()
-    cur = con.cursor()
 
-    # CD タイトルを取得
-    cd = cur.execute('SELECT * FROM cds WHERE id = ?', (id,)).fetchone()
+    # 4 つの SELECT を 1 つの読み取りトランザクションにまとめ、
+    # 文ごとのロック取得を省きつつ同一スナップショットの一覧を得る
+    con.execute('BEGIN DEFERRED')
+    try:
+        # CD タイトルを取得
+        cd = con.execute(SQL_SELECT_CD_BY_ID, (id,)).fetchone()
 
-    songs = cur.execute('SELECT * FROM songs').fetchall()
-    artists = cur.execute('SELECT * FROM artists').fetchall()
+        songs = cached_fetchall(SQL_SELECT_SONGS_ALL, (), 'songs')
+        artists = cached_fetchall(SQL_SELECT_ARTISTS_ALL, (), 'artists')
 
-    # トラック情報を取得
-    tracks = cur.execute(
-        'SELECT t.track_number, t.song_id, ta.artist_id '
-        'FROM tracks t '
-        'JOIN songs s ON s.id = t.song_id '
-        'JOIN tracks_artists ta ON ta.cd_id = t.cd_id AND ta.track_number = t.track_number '
-        'JOIN artists a ON a.id = ta.artist_id '
-        'WHERE t.cd_id = ? '
-        'ORDER BY t.track_number '
-    , (id,)).fetchall()
+        # トラック情報を取得
+        tracks = con.execute(SQL_SELECT_TRACKS_FOR_EDIT, (id,)).fetchall()
+    finally:
+        con.commit()
 
     # 編集対象の CD 情報をテンプレートへ渡してレンダリングしたものを返す
     return render_template('tracks-edit.html', cd=cd, tracks=tracks, songs=songs, artists=artists)
 
 @app.route('/tracks-edit/<id>', methods=['POST'])
 def tracks_edit_update(id: str) -> Response:
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
     # リクエストされた POST パラメータの内容を取り出す
     cd_id = id
@@ -1175,8 +1622,8 @@ def tracks_edit_update(id: str) -> Response:
 
     if new_artist_id_str == 'delete':
         try:
-            cur.execute('DELETE FROM tracks_artists WHERE cd_id = ? AND track_number = ? AND artist_id = ?', (cd_id, track_number, artist_id))
-            con.commit()
+            # （自動コミットモードなので DELETE は実行と同時に確定する）
+            con.execute('DELETE FROM tracks_artists WHERE cd_id = ? AND track_number = ? AND artist_id = ?', (cd_id, track_number, artist_id))
 
             # 編集が終了したらトラック編集ページに戻りたかったが、結果ページへ戻すことにする
             return redirect(url_for('tracks_edit_results',
@@ -1198,11 +1645,17 @@ def tracks_edit_update(id: str) -> Response:
     # 変更がない場合編集画面にそのまま戻る
     if song_id == new_song_id and artist_id == new_artist_id:
         return redirect(url_for('tracks_edit_results', code='unchanged', cd_id=cd_id))
+
+    # 両方を変更する場合だけ 1 トランザクションに束ねる
+    # （片方だけの変更は自動コミットの単文で済み、BEGIN も COMMIT も不要）
+    both_changed = song_id != new_song_id and artist_id != new_artist_id
+    if both_changed:
+        con.execute('BEGIN IMMEDIATE')
     # 楽曲に変更があった場合
     if song_id != new_song_id:
         try:
             # tracks テーブルの指定された行のパラメータを更新
-            cur.execute(
+            con.execute(
             'UPDATE tracks '
             'SET song_id = ? '
             'WHERE cd_id = ? AND track_number = ? '
@@ -1215,7 +1668,7 @@ def tracks_edit_update(id: str) -> Response:
     if artist_id != new_artist_id:
         try:
             # tracks テーブルの指定された行のパラメータを更新
-            cur.execute(
+            con.execute(
             'UPDATE tracks_artists '
             'SET artist_id = ? '
             'WHERE cd_id = ? AND track_number = ? AND artist_id = ?'
@@ -1224,7 +1677,8 @@ def tracks_edit_update(id: str) -> Response:
             return redirect(url_for('tracks_edit_results',
                             code='database-error', cd_id=cd_id))
 
-    con.commit()
+    if both_changed:
+        con.commit()
 
     # 編集が終了したらトラック編集ページに戻りたかったが、結果ページへ戻すことにする
     return redirect(url_for('tracks_edit_results',
@@ -1235,26 +1689,24 @@ def tracks_edit_update(id: str) -> Response:
 def tracks_edit_results(code: str, cd_id: str) -> str:
 
     return render_template('tracks-edit-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'), cd_id=cd_id)
+                           results=result_message(code), cd_id=cd_id)
 
 
 @app.route('/track-artist-edit/<id>/<track_number>')
 def track_artist_edit(id: str, track_number:str) -> str:
 
     con = get_db()
-    cur = con.cursor()
 
-    artists = cur.execute('SELECT * FROM artists').fetchall()
-    track = cur.execute('SELECT cd_id, track_number FROM tracks WHERE cd_id = ? AND track_number = ? ', (id, track_number,)).fetchone()
+    artists = cached_fetchall(SQL_SELECT_ARTISTS_ALL, (), 'artists')
+    track = con.execute('SELECT cd_id, track_number FROM tracks WHERE cd_id = ? AND track_number = ? ', (id, track_number,)).fetchone()
 
     # 編集対象の CD 情報をテンプレートへ渡してレンダリングしたものを返す
     return render_template('track-artist-edit.html', cd_id=id, track=track, artists=artists)
 
 @app.route('/track-artist-edit/<id>/<track_number>', methods=['POST'])
 def track_artist_edit_update(id: str, track_number:str) -> Response:
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
     # リクエストされた POST パラメータの内容を取り出す
     cd_id = id
@@ -1267,28 +1719,21 @@ def track_artist_edit_update(id: str, track_number:str) -> Response:
         artist_id = int(artist_id_str)
     except ValueError:
     # シリーズ通し番号が整数型へ変換できない
-        print(artist_id)
-        return redirect(url_for('tracks_edit_results',
-                    code='include-invalid-charactor'))
-
-    track_artist = cur.execute('SELECT * FROM tracks_artists WHERE cd_id = ? AND track_number = ? AND artist_id = ?',
-                           (cd_id, track_number, artist_id,)).fetchone()
-    if track_artist is not None:
-        return redirect(url_for('tracks_edit_results',
-                                code='track-artist-already-exists'))
+        return redirect_results('tracks_edit_results', 'include-invalid-charactor')
 
     try:
-        # cds テーブルに指定されたパラメータの行を挿入
-        cur.execute('INSERT INTO tracks_artists '
-                    '(cd_id, track_number, artist_id) '
-                    'VALUES (?, ?, ?)',
-                    (cd_id, track_number, artist_id))
+        # tracks_artists テーブルに行を挿入
+        # （INSERT OR IGNORE なら重複チェックと挿入が 1 文で済む）
+        cur = con.execute('INSERT OR IGNORE INTO tracks_artists '
+                          '(cd_id, track_number, artist_id) '
+                          'VALUES (?, ?, ?)',
+                          (cd_id, track_number, artist_id))
     except sqlite3.Error:
         # データベースエラーが発生
-        return redirect(url_for('tracks_edit_results',
-                                code='database-error'))
-    # コミット（データベース更新処理を確定）
-    con.commit()
+        return redirect_results('tracks_edit_results', 'database-error')
+    if cur.rowcount == 0:
+        # 同じ組み合わせの行が既に存在（IGNORE で何も挿入されなかった）
+        return redirect_results('tracks_edit_results', 'track-artist-already-exists')
 
     # 編集が終了したらトラック編集ページに戻りたかったが、結果ページへ戻すことにする
     return redirect(url_for('tracks_edit_results',
@@ -1299,50 +1744,38 @@ def track_artist_edit_update(id: str, track_number:str) -> Response:
 @app.route('/artists')
 def artists() -> str:
 
-    cur = get_db().cursor()
+    con = get_db()
 
-    artists = cur.execute('SELECT * FROM artists').fetchall()
+    artists = cached_fetchall(SQL_SELECT_ARTISTS_ALL, (), 'artists')
 
     return render_template('artists.html', artists=artists)
 
 @app.route('/artists', methods=['POST'])
 def artists_filtered() -> str:
-    cur = get_db().cursor()
+    con = get_db()
 
-    artists = cur.execute('SELECT * FROM artists WHERE name LIKE ?', (request.form['name_filter'],)).fetchall()
+    # 一覧をリスト化せずカーソルのままテンプレートへ渡し、
+    # レンダリング結果をストリーミングして返す
+    artists = con.execute(SQL_SELECT_ARTISTS_BY_NAME,
+                          (request.form['name_filter'],))
 
-    return render_template('artists.html', artists=artists)
+    return stream_template('artists.html', artists=artists)
 
 
 @app.route('/artist/<id>')
 def artist(id: str) -> str:
     con = get_db()
-    cur = con.cursor()
 
     # artists テーブルから指定された アーティストID の行を 1 行だけ取り出す
-    artist = cur.execute('SELECT * FROM artists WHERE id = ? ',
+    artist = con.execute('SELECT * FROM artists WHERE id = ? ',
                          (id,)).fetchone()
     if artist is None:
         # 指定された アーティストID の行が無かった
         return render_template('index.html')
 
-    cds = cur.execute(
-                    'SELECT DISTINCT c.title AS cd_title, c.id AS cd_id '
-                    'FROM cds c '
-                    'JOIN tracks t ON t.cd_id = c.id '
-                    'JOIN tracks_artists ta ON ta.cd_id = t.cd_id AND ta.track_number = t.track_number '
-                    'JOIN artists a ON a.id = ta.artist_id '
-                    'WHERE a.id = ? '
-    , (id, )).fetchall()
-
-    concerts = cur.execute(
-                    'SELECT DISTINCT c.title AS concert_title, c.id AS concert_id '
-                    'FROM concerts c '
-                    'JOIN performances p ON p.concert_id = c.id '
-                    'JOIN artists_performances ap ON ap.concert_id = p.concert_id AND ap.order_in_concert = p.number_of_order '
-                    'JOIN artists a ON a.id = ap.artist_id '
-                    'WHERE a.id = ? '
-    , (id, )).fetchall()
+    cds = con.execute(SQL_SELECT_ARTIST_CDS, (id,)).fetchall()
+
+    concerts = con.execute(SQL_SELECT_ARTIST_CONCERTS, (id,)).fetchall()
 
 
     return render_template('artist.html', artist=artist, cds=cds, concerts=concerts)
@@ -1353,9 +1786,8 @@ def artist_add() -> str:
 
 @app.route('/artist-add', methods=['POST'])
 def artist_add_execute() -> Response:
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
     id = request.form['id']
     name = request.form['name']
@@ -1368,56 +1800,45 @@ def artist_add_execute() -> Response:
         id = int(id)
       except ValueError:
         # シリーズ通し番号が整数型へ変換できない
-        return redirect(url_for('artist_add_results',
-                    code='id-has-invalid-charactor'))
-
-    # アーティスト名のチェック
-    if has_control_character(name):
-        # 制御文字が含まれる
-        return redirect(url_for('artist_add_results',
-                                code='include-control-charactor'))
+        return redirect_results('artist_add_results', 'id-has-invalid-charactor')
 
-    # issued_dateのチェック
-    if has_control_character(group_name):
+    # アーティスト名とグループ名を連結して 1 回の走査でチェックする
+    if has_control_character(name + group_name):
         # 制御文字が含まれる
-        return redirect(url_for('cd_add_results',
-                                code='include-control-charactor'))
+        return redirect_results('artist_add_results', 'include-control-charactor')
 
     # データベースへアーティストを追加
     try:
         # artists テーブルに指定されたパラメータの行を挿入
-        cur.execute('INSERT INTO artists '
+        con.execute('INSERT INTO artists '
                     '(id, name, group_name) '
                     'VALUES (?, ?, ?)',
                     (id, name, group_name))
     except sqlite3.Error:
         # データベースエラーが発生
-        return redirect(url_for('artist_add_results',
-                                code='database-error'))
-    # コミット（データベース更新処理を確定）
-    con.commit()
+        return redirect_results('artist_add_results', 'database-error')
+
+    # artists テーブルが変わったので関連キャッシュを破棄
+    invalidate_table_caches('artists')
 
     # アーティスト追加完了
-    return redirect(url_for('artist_add_results',
-                            code='artist-added'))
+    return redirect_results('artist_add_results', 'artist-added')
 
 @app.route('/artist-add-results/<code>')
 def artist_add_results(code: str) -> str:
-    return render_template('artist-add-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'))
+    return render_results_page('artist-add-results.html', code)
 
 @app.route('/artist-del/<id>')
 def artist_del(id: str) -> str:
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
-    try:
-        # アーティストIDの存在チェックをする：
-        # artists テーブルで同じCD番号の行を 1 行だけ取り出す
-        artist = cur.execute('SELECT * FROM artists WHERE id = ?',
-                             (id,)).fetchone()
-    except artist is None:
+    # アーティストIDの存在チェックをする：
+    # artists テーブルで同じCD番号の行を 1 行だけ取り出す
+    # （確認 → 削除の流れで同じ行を引くため、版数付きキャッシュを通す）
+    rows = cached_fetchall(SQL_SELECT_ARTIST_ID_NAME, (id,), 'artists')
+    artist = rows[0] if rows else None
+    if artist is None:
         # 指定されたアーティストIDの行が無い
         return render_template('artist-del-results.html',
                                results='指定されたアーティストは存在しません')
@@ -1426,32 +1847,25 @@ def artist_del(id: str) -> str:
 
 @app.route('/artist-del/<id>', methods=['POST'])
 def artist_del_execute(id: str) -> Response:
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
-
-    try:
-        # IDの存在チェックをする：
-        # artists テーブルで同じCD番号の行を 1 行だけ取り出す
-        artist = cur.execute('SELECT id FROM artists WHERE id = ?',
-                         (id,)).fetchone()
-    except artist is None:
-        # 指定されたIDの行が無い
-        return redirect(url_for('artist_del_results',
-                                code='id-does-not-exist'))
 
     try:
         # artists テーブルの指定された行を削除
-        cur.execute('DELETE FROM artists WHERE id = ?', (id,))
+        # （事前の存在チェックはせず rowcount で判定する）
+        cur = con.execute('DELETE FROM artists WHERE id = ?', (id,))
     except sqlite3.Error:
         # データベースエラーが発生
-        return redirect(url_for('artist_add_results',
-                                code='database-error'))
-    con.commit()
+        return redirect_results('artist_add_results', 'database-error')
+    if cur.rowcount == 0:
+        # 指定されたIDの行が無い
+        return redirect_results('artist_del_results', 'id-does-not-exist')
+
+    # artists テーブルが変わったので関連キャッシュを破棄
+    invalidate_table_caches('artists')
 
     # アーティスト削除完了
-    return redirect(url_for('artist_del_results',
-                            code='deleted'))
+    return redirect_results('artist_del_results', 'deleted')
 
 @app.route('/artist-del-results/<code>')
 def artist_del_results(code: str) -> str:
@@ -1468,53 +1882,39 @@ def artist_del_results(code: str) -> str:
     Returns:
       str: ページのコンテンツ
     """
-    return render_template('artist-del-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'))
+    return render_results_page('artist-del-results.html', code)
 
 @app.route('/artist-edit/<id>')
 def artist_edit(id: str) -> str:
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
-    artist = cur.execute('SELECT * FROM artists WHERE id = ?',
-                        (id,)).fetchone()
+    # 編集 → 保存の流れで同じ行を何度も引くため、版数付きキャッシュを通す
+    rows = cached_fetchall(SQL_SELECT_ARTIST_BY_ID, (id,), 'artists')
+    artist = rows[0] if rows else None
 
     # 編集対象の アーティスト 情報をテンプレートへ渡してレンダリングしたものを返す
     return render_template('artist-edit.html', artist=artist)
 
 @app.route('/artist-edit/<id>', methods=['POST'])
 def artist_edit_update(id: str) -> Response:
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
-
-    # artist の存在チェックをする：
-    # artists テーブルで同じ ID の行を 1 行だけ取り出す
-    artist = cur.execute('SELECT id FROM artists WHERE id = ?',
-                           (id,)).fetchone()
-    if artist is None:
-        # 指定された ID の行が無い
-        return redirect(url_for('artist_edit_results',
-                                code='id-does-not-exist', artist_id=id))
 
     # リクエストされた POST パラメータの内容を取り出す
     name = request.form['name']
     group_name = request.form['group_name']
 
-    if has_control_character(name):
-            # 制御文字が含まれる
-            return redirect(url_for('song_edit_results',
-                                    code='include-control-charactor', artist_id=id))
-
-    if has_control_character(group_name):
-            # 制御文字が含まれる
-            return redirect(url_for('song_edit_results',
-                                    code='include-control-charactor', artist_id=id))
+    # アーティスト名とグループ名を連結して 1 回の走査でチェックする
+    if has_control_character(name + group_name):
+        # 制御文字が含まれる
+        return redirect(url_for('song_edit_results',
+                                code='include-control-charactor', artist_id=id))
 
     # データベースを更新
+    # （事前の存在チェックはせず UPDATE の rowcount で判定する）
     try:
-        cur.execute('UPDATE artists '
+        cur = con.execute('UPDATE artists '
                     'SET name = ?, '
                     'group_name = ? '
                     'WHERE id = ?',
@@ -1523,8 +1923,13 @@ def artist_edit_update(id: str) -> Response:
         # データベースエラーが発生
         return redirect(url_for('artist_edit_results',
                                 code='database-error', artist_id=id))
-    # コミット（データベース更新処理を確定）
-    con.commit()
+    if cur.rowcount == 0:
+        # 指定された ID の行が無い（更新対象が存在しなかった）
+        return redirect(url_for('artist_edit_results',
+                                code='id-does-not-exist', artist_id=id))
+
+    # artists テーブルが変わったので関連キャッシュを破棄
+    invalidate_table_caches('artists')
 
     # アーティスト編集完了
     return redirect(url_for('artist_edit_results',
@@ -1533,55 +1938,46 @@ def artist_edit_update(id: str) -> Response:
 @app.route('/artist-edit-results/<code>/<artist_id>')
 def artist_edit_results(code: str, artist_id: str) -> str:
     return render_template('artist-edit-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'), artist_id=artist_id)
+                           results=result_message(code), artist_id=artist_id)
 
 # コンサート関連ページ
 @app.route('/concerts')
 def concerts() -> str:
-    # データベース接続してカーソルを得る
-    cur = get_db().cursor()
+    # データベース接続を得る
+    con = get_db()
 
-    # concerts テーブルの全行から コンサート の情報を取り出した一覧を取得
-    concerts = cur.execute('SELECT * FROM concerts ORDER BY held_date').fetchall()
+    # concerts テーブルの全行から コンサート の情報を取り出す
+    # （リスト化せずカーソルのまま渡してストリーミングで返す）
+    concerts = con.execute(SQL_SELECT_CONCERTS_ALL)
 
-    # 一覧をテンプレートへ渡してレンダリングしたものを返す
-    return render_template('concerts.html', concerts=concerts)
+    return stream_template('concerts.html', concerts=concerts)
 
 @app.route('/concerts', methods=['POST'])
 def concerts_filtered() -> str:
-    # データベース接続してカーソルを得る
-    cur = get_db().cursor()
+    # データベース接続を得る
+    con = get_db()
 
     # concerts テーブルからタイトルで絞り込み、
-    # 得られた全行から コンサート の情報を取り出した一覧を取得
-    concerts = cur.execute('SELECT * FROM concerts WHERE title LIKE ? ORDER BY held_date', (request.form['title_filter'],)).fetchall()
+    # リスト化せずカーソルのまま渡してストリーミングで返す
+    concerts = con.execute(SQL_SELECT_CONCERTS_BY_TITLE,
+                           (request.form['title_filter'],))
 
-    # 一覧をテンプレートへ渡してレンダリングしたものを返す
-    return render_template('concerts.html', concerts=concerts)
+    return stream_template('concerts.html', concerts=concerts)
 
 @app.route('/concert/<id>')
 def concert(id: str) -> str:
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
     # concerts テーブルから指定された ID の行を 1 行だけ取り出す
-    concert = cur.execute('SELECT * FROM concerts WHERE id = ?', (id,)).fetchone()
+    concert = con.execute('SELECT * FROM concerts WHERE id = ?', (id,)).fetchone()
 
     if concert is None:
         # 指定された ID の行が無かった
         return render_template('concert-not-found.html')
 
-    performances = cur.execute(
-                        'SELECT p.number_of_order AS number_of_order, s.title AS song_title, s.id AS song_id, GROUP_CONCAT(a.name, ", ") AS artists '
-                        'FROM performances p '
-                        'JOIN songs s ON s.id = p.song_id '
-                        'JOIN artists_performances ap ON ap.concert_id = p.concert_id AND ap.order_in_concert = p.number_of_order '
-                        'JOIN artists a ON a.id = ap.artist_id '
-                        'WHERE p.concert_id = ? '
-                        'GROUP BY p.number_of_order, s.title '
-                        'ORDER BY p.number_of_order',
-                        (id,)).fetchall()
+    performances = con.execute(SQL_SELECT_CONCERT_PERFORMANCES,
+                               (id,)).fetchall()
 
     # 楽曲の情報をテンプレートへ渡してレンダリングしたものを返す
     return render_template('concert.html', concert=concert, performances=performances)
@@ -1593,80 +1989,66 @@ def concert_add() -> str:
 
 @app.route('/concert-add', methods=['POST'])
 def concert_add_execute() -> Response:
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
     # リクエストされた POST パラメータの内容を取り出す
-    id_str = request.form['id']
-    title = request.form['title']
-    held_date = request.form['held-date']
+    # （request.form のプロキシ解決を 1 回で済ませる）
+    form = request.form
+    id_str = form['id']
+    title = form['title']
+    held_date = form['held-date']
 
     try:
     # 文字列型で渡されたIDを整数型へ変換する
         id = int(id_str)
     except ValueError:
     # シリーズ通し番号が整数型へ変換できない
-        return redirect(url_for('concert_add_results',
-                code='id-has-invalid-charactor'))
-
-    concert = cur.execute('SELECT id FROM concerts WHERE id = ?',
-                           (id,)).fetchone()
+        return redirect_results('concert_add_results', 'id-has-invalid-charactor')
 
-    if concert is not None:
-        # 指定されたIDの行が既に存在
-        return redirect(url_for('concert_add_results',
-                                code='id-already-exists'))
-    # タイトルチェック
-    if has_control_character(title):
-        # 制御文字が含まれる
-        return redirect(url_for('concert_add_results',
-                                code='include-control-charactor'))
-
-    # 開催日チェック
-    if has_control_character(held_date):
+    # タイトルと開催日を連結して 1 回の走査でチェックする
+    if has_control_character(title + held_date):
         # 制御文字が含まれる
-        return redirect(url_for('concert_add_results',
-                                code='include-control-charactor'))
+        return redirect_results('concert_add_results', 'include-control-charactor')
 
-    # データベースへ楽曲を追加
+    # データベースへコンサートを追加
+    # （INSERT OR IGNORE なら存在チェックと挿入が 1 文で済み、
+    #   SELECT と INSERT の間に別リクエストが割り込む余地も無い）
     try:
-        # concerts テーブルに指定されたパラメータの行を挿入
-        cur.execute('INSERT INTO concerts '
+        cur = con.execute('INSERT OR IGNORE INTO concerts '
                     '(id, title, held_date) '
                     'VALUES (?, ?, ?)',
                     (id, title, held_date))
     except sqlite3.Error:
         # データベースエラーが発生
-        return redirect(url_for('concert_add_results',
-                                code='database-error'))
-    # コミット（データベース更新処理を確定）
-    con.commit()
+        return redirect_results('concert_add_results', 'database-error')
+    if cur.rowcount == 0:
+        # 指定されたIDの行が既に存在（IGNORE で何も挿入されなかった）
+        return redirect_results('concert_add_results', 'id-already-exists')
+
+    # concerts テーブルが変わったので関連キャッシュを破棄
+    invalidate_table_caches('concerts')
 
     # コンサート追加完了
-    return redirect(url_for('concert_add_results',
-                            code='concert-added'))
+    return redirect_results('concert_add_results', 'concert-added')
 
 @app.route('/concert-add-results/<code>')
 def concert_add_results(code: str) -> str:
 
-    return render_template('concert-add-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'))
+    return render_results_page('concert-add-results.html', code)
 
-@app.route('/concert-del/<id>')
-def concert_del(id: str) -> str:
-    # データベース接続してカーソルを得る
+@app.route('/concert-del/<int:id>')
+def concert_del(id: int) -> str:
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
-
-    id = int(id)
 
-    try:
-        # コンサートIDの存在チェックをする：
-        # concerts テーブルで同じIDの行を 1 行だけ取り出す
-        concert = cur.execute('SELECT id FROM concerts WHERE id = ?',
-                         (id,)).fetchone()
-    except concert is None:
+    # コンサートIDの存在チェックをする：
+    # concerts テーブルで同じIDの行を 1 行だけ取り出す
+    # （テンプレートが id を参照するので SELECT 1 ではなく列を絞って取り、
+    #   確認 → 削除の流れで同じ行を引くため版数付きキャッシュを通す）
+    rows = cached_fetchall(SQL_SELECT_CONCERT_ID_TITLE, (id,), 'concerts')
+    concert = rows[0] if rows else None
+    if concert is None:
         # 指定されたIDの行が無い
         return render_template('concert-del-results.html',
                                results='指定されたコンサートは存在しません')
@@ -1674,89 +2056,72 @@ def concert_del(id: str) -> str:
     return render_template('concert-del.html', id=id, concert=concert)
 
 
-@app.route('/concert-del/<id>', methods=['POST'])
-def concert_del_execute(id: str) -> Response:
-    # データベース接続してカーソルを得る
+@app.route('/concert-del/<int:id>', methods=['POST'])
+def concert_del_execute(id: int) -> Response:
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
-
-    id = int(id)
-
-    try:
-        # IDの存在チェックをする：
-        # concerts テーブルで同じ楽曲IDの行を 1 行だけ取り出す
-        concert = cur.execute('SELECT id FROM concerts WHERE id = ?',
-                         (id,)).fetchone()
-    except concert is None:
-        # 指定された楽曲IDの行が無い
-        return redirect(url_for('concert_del_results',
-                                code='id-does-not-exist'))
 
     try:
-        # artists_performances, performances, concerts から指定された行を削除
-        cur.execute('DELETE FROM artists_performances WHERE concert_id = ?', (id,))
-        cur.execute('DELETE FROM performances WHERE concert_id = ?', (id,))
-        cur.execute('DELETE FROM concerts WHERE id = ?', (id,))
+        # artists_performances, performances, concerts から指定された行を
+        # 1 トランザクションで削除
+        # （事前の存在チェックはせず最後の DELETE の rowcount で判定する）
+        con.execute('BEGIN IMMEDIATE')
+        con.execute('DELETE FROM artists_performances WHERE concert_id = ?', (id,))
+        con.execute('DELETE FROM performances WHERE concert_id = ?', (id,))
+        cur = con.execute('DELETE FROM concerts WHERE id = ?', (id,))
     except sqlite3.Error:
         # データベースエラーが発生
-        return redirect(url_for('concert_del_results',
-                                code='database-error'))
+        return redirect_results('concert_del_results', 'database-error')
+    if cur.rowcount == 0:
+        # 指定されたIDの行が無い（削除対象が存在しなかった）
+        con.rollback()
+        return redirect_results('concert_del_results', 'id-does-not-exist')
 
     con.commit()
 
+    # concerts テーブルが変わったので関連キャッシュを破棄
+    invalidate_table_caches('concerts')
+
     # コンサート削除完了
-    return redirect(url_for('concert_del_results',
-                            code='deleted'))
+    return redirect_results('concert_del_results', 'deleted')
 
 
 @app.route('/concert-del-results/<code>')
 def concert_del_results(code: str) -> str:
-    return render_template('concert-del-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'))
+    return render_results_page('concert-del-results.html', code)
 
 
 @app.route('/concert-edit/<id>')
 def concert_edit(id: str) -> str:
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
-    concert = cur.execute('SELECT * FROM concerts WHERE id = ?',
-                        (id,)).fetchone()
+    # 編集 → 保存の流れで同じ行を何度も引くため、版数付きキャッシュを通す
+    rows = cached_fetchall(SQL_SELECT_CONCERT_BY_ID, (id,), 'concerts')
+    concert = rows[0] if rows else None
 
     # 編集対象の コンサート 情報をテンプレートへ渡してレンダリングしたものを返す
     return render_template('concert-edit.html', concert=concert)
 
 @app.route('/concert-edit/<id>', methods=['POST'])
 def concert_edit_update(id: str) -> Response:
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
-
-    concert = cur.execute('SELECT id FROM concerts WHERE id = ?',
-                           (id,)).fetchone()
-    if concert is None:
-        # 指定された ID の行が無い
-        return redirect(url_for('concert_edit_results',
-                                code='id-does-not-exist', concert_id=id))
 
     # リクエストされた POST パラメータの内容を取り出す
     title = request.form['title']
     held_date = request.form['held_date']
 
-    if has_control_character(title):
-            # 制御文字が含まれる
-            return redirect(url_for('concert_edit_results',
-                                    code='include-control-charactor', concert_id=id))
-
-    if has_control_character(held_date):
-            # 制御文字が含まれる
-            return redirect(url_for('concert_edit_results',
-                                    code='include-control-charactor', concert_id=id))
+    # タイトルと開催日を連結して 1 回の走査でチェックする
+    if has_control_character(title + held_date):
+        # 制御文字が含まれる
+        return redirect(url_for('concert_edit_results',
+                                code='include-control-charactor', concert_id=id))
 
     # データベースを更新
+    # （事前の存在チェックはせず UPDATE の rowcount で判定する）
     try:
-        cur.execute('UPDATE concerts '
+        cur = con.execute('UPDATE concerts '
                     'SET title = ?, '
                     'held_date = ? '
                     'WHERE id = ?',
@@ -1766,8 +2131,13 @@ def concert_edit_update(id: str) -> Response:
         # データベースエラーが発生
         return redirect(url_for('concert_edit_results',
                                 code='database-error', concert_id=id))
-    # コミット（データベース更新処理を確定）
-    con.commit()
+    if cur.rowcount == 0:
+        # 指定された ID の行が無い（更新対象が存在しなかった）
+        return redirect(url_for('concert_edit_results',
+                                code='id-does-not-exist', concert_id=id))
+
+    # concerts テーブルが変わったので関連キャッシュを破棄
+    invalidate_table_caches('concerts')
 
     # コンサート編集完了
     return redirect(url_for('concert_edit_results',
@@ -1778,41 +2148,43 @@ def concert_edit_update(id: str) -> Response:
 def concert_edit_results(code: str, concert_id: str) -> str:
 
     return render_template('concert-edit-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'), concert_id=concert_id)
+                           results=result_message(code), concert_id=concert_id)
 
 
 # セットリスト関連ページ
-@app.route('/setlist-add/<id>')
-def setlist_add(id: str) -> str:
+@app.route('/setlist-add/<int:id>')
+def setlist_add(id: int) -> str:
     con = get_db()
-    cur = con.cursor()
 
-    concert = cur.execute('SELECT * FROM concerts WHERE id = ?', (id,)).fetchone()
-    songs = cur.execute('SELECT * FROM songs').fetchall()
-    artists = cur.execute('SELECT * FROM artists').fetchall()
+    # 3 つの SELECT を 1 つの読み取りトランザクションにまとめ、
+    # 文ごとのロック取得を省きつつ同一スナップショットの一覧を得る
+    con.execute('BEGIN DEFERRED')
+    try:
+        concert = con.execute('SELECT * FROM concerts WHERE id = ?',
+                              (id,)).fetchone()
+        songs = cached_fetchall(SQL_SELECT_SONGS_ALL, (), 'songs')
+        artists = cached_fetchall(SQL_SELECT_ARTISTS_ALL, (), 'artists')
+    finally:
+        con.commit()
+
+    if concert is None:
+        # 指定された ID の行が無かった（削除済みコンサートへのブックマーク等）
+        return render_template('concert-not-found.html')
 
     return render_template('setlist-add.html', concert=concert, songs=songs, artists=artists)
 
 
-@app.route('/setlist-add/<id>', methods=['POST'])
-def setlist_add_execute(id: str) -> Response:
-     # データベース接続してカーソルを得る
+@app.route('/setlist-add/<int:id>', methods=['POST'])
+def setlist_add_execute(id: int) -> Response:
+     # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
-    concert_id_str = id
+    # URL コンバータが <int:id> を変換済みなので id はそのまま使える
+    concert_id = id
     number_of_order_str = request.form['number_of_order']
     song_id = request.form['song_id']
     artist_id = request.form['artist_id']
 
-    try:
-        # 文字列型で渡されたシリーズ通し番号を整数型へ変換する
-        concert_id = int(concert_id_str)
-    except ValueError:
-    # セットリスト番号が整数型へ変換できない
-        return redirect(url_for('setlist_add_results',
-                    code='id-has-invalid-charactor', concert_id=concert_id))
-
     try:
         # 文字列型で渡されたセットリスト番号を整数型へ変換する
         number_of_order = int(number_of_order_str)
@@ -1821,40 +2193,34 @@ def setlist_add_execute(id: str) -> Response:
         return redirect(url_for('setlist_add_results',
                     code='number-of-order-has-invalid-charactor', concert_id=concert_id))
 
-    check_same_number_of_order = cur.execute('SELECT * FROM performances WHERE concert_id = ? AND number_of_order = ?',
-        (concert_id, number_of_order)).fetchall()
-
-    if len(check_same_number_of_order) > 0:
+    # セットリスト番号の重複・楽曲ID・アーティストIDの存在チェックを
+    # 1 クエリでまとめて行う（3 回の往復を 1 回に減らせる）
+    (order_exists, song_exists, artist_exists) = con.execute(
+        SQL_SETLIST_ADD_CHECKS,
+        (concert_id, number_of_order, song_id, artist_id)).fetchone()
+    if order_exists:
+        # 同じセットリスト番号の行が既にある
         return redirect(url_for('setlist_add_results',
                     code='add-artist-from-selist-edit-page', concert_id=concert_id))
-
-
-    # 楽曲IDの存在チェックをする：
-    # songs テーブルで同じIDの行を 1 行だけ取り出す
-    song = cur.execute('SELECT id FROM songs WHERE id = ?',
-                         (song_id,)).fetchone()
-    if song is None:
+    if not song_exists:
         # 指定されたIDの行が無い
         return redirect(url_for('setlist_add_results',
                                 code='song-does-not-exist', concert_id=concert_id))
-
-    # アーティストIDの存在チェックをする：
-    # artists テーブルで同じIDの行を 1 行だけ取り出す
-    artist = cur.execute('SELECT id FROM artists WHERE id = ?',
-                         (artist_id,)).fetchone()
-    if artist is None:
+    if not artist_exists:
         # 指定されたIDの行が無い
         return redirect(url_for('setlist_add_results',
                                 code='artist-does-not-exist', concert_id=concert_id))
 
     try:
+        # 2 つの INSERT を 1 トランザクションで実行する
+        con.execute('BEGIN IMMEDIATE')
         # performances, artists_performances テーブルの指定された行のパラメータを更新
-        cur.execute(
+        con.execute(
                     'INSERT INTO performances '
                     '(concert_id, number_of_order, song_id) '
                     'VALUES (?, ?, ?) ',
                     (concert_id, number_of_order, song_id))
-        cur.execute(
+        con.execute(
                     'INSERT INTO artists_performances '
                     '(concert_id, order_in_concert, artist_id) '
                     'VALUES (?, ?, ?) ',
@@ -1871,7 +2237,7 @@ def setlist_add_execute(id: str) -> Response:
 @app.route('/setlist-add-results/<code>/<concert_id>')
 def setlist_add_results(code: str, concert_id: str) -> str:
     return render_template('setlist-add-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'), concert_id=concert_id)
+                           results=result_message(code), concert_id=concert_id)
 
 
 @app.route('/setlist-del/<id>')
@@ -1885,12 +2251,11 @@ def setlist_del(id: str) -> str:
     Returns:
       str: ページのコンテンツ
     """
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
-    concert = cur.execute('SELECT * FROM concerts WHERE id = ?',
-                         (id,)).fetchone()
+    concert = con.execute(SQL_SELECT_CONCERT_ID_TITLE,
+                          (id,)).fetchone()
     if concert is None:
         # 指定されたIDの行が無い
         return render_template('setlist-del-results.html',
@@ -1906,26 +2271,25 @@ def setlist_del_execute(id: str) -> Response:
     Returns:
       Response: リダイレクト情報
     """
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
     # artists_performances, performances からconcert_idに指定したCD番号を持つものを削除
+    # （2 つの DELETE を 1 トランザクションで実行する）
     try:
-        cur.execute('DELETE FROM artists_performances WHERE concert_id = ?', (id,))
-        cur.execute('DELETE FROM performances WHERE concert_id = ?', (id,))
-    except sqlite3.Error as e:
-        # データベースエラーが発生
-        print(e)
-        return redirect(url_for('setlist_del_results',
-                                code='database-error'))
+        con.execute('BEGIN IMMEDIATE')
+        con.execute('DELETE FROM artists_performances WHERE concert_id = ?', (id,))
+        con.execute('DELETE FROM performances WHERE concert_id = ?', (id,))
+    except sqlite3.Error:
+        # データベースエラーが発生（詳細はログに残す）
+        app.logger.exception('setlist delete failed: concert_id=%s', id)
+        return redirect_results('setlist_del_results', 'database-error')
 
     # コミット
     con.commit()
 
     # セットリスト削除完了
-    return redirect(url_for('setlist_del_results',
-                            code='deleted'))
+    return redirect_results('setlist_del_results', 'deleted')
 
 
 @app.route('/setlist-del-results/<code>')
@@ -1943,172 +2307,158 @@ def setlist_del_results(code: str) -> str:
     Returns:
       str: ページのコンテンツ
     """
-    return render_template('setlist-del-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'))
+    return render_results_page('setlist-del-results.html', code)
 
 
 @app.route('/setlist-edit/<id>')
 def setlist_edit(id: str) -> str:
     con = get_db()
-    cur = con.cursor()
 
-    concert = cur.execute('SELECT * FROM concerts WHERE id = ?', (id,)).fetchone()
-    songs = cur.execute('SELECT * FROM songs').fetchall()
-    artists = cur.execute('SELECT * FROM artists').fetchall()
+    # 4 つの SELECT を 1 つの読み取りトランザクションにまとめ、
+    # 文ごとのロック取得を省きつつ同一スナップショットの一覧を得る
+    con.execute('BEGIN DEFERRED')
+    try:
+        concert = con.execute('SELECT * FROM concerts WHERE id = ?',
+                              (id,)).fetchone()
+        songs = cached_fetchall(SQL_SELECT_SONGS_ALL, (), 'songs')
+        artists = cached_fetchall(SQL_SELECT_ARTISTS_ALL, (), 'artists')
+
+        performances = con.execute(SQL_SELECT_SETLIST_FOR_EDIT,
+                                   (id,)).fetchall()
+    finally:
+        con.commit()
 
-    performances = cur.execute(
-        'SELECT p.number_of_order, p.song_id, ap.artist_id '
-        'FROM performances p '
-        'JOIN artists_performances ap ON ap.concert_id = p.concert_id AND ap.order_in_concert = p.number_of_order '
-        'WHERE p.concert_id = ? '
-        , (id,)).fetchall()
+    if concert is None:
+        # 指定された ID の行が無かった（削除済みコンサートへのブックマーク等）
+        return render_template('concert-not-found.html')
 
     # 編集対象の CD 情報をテンプレートへ渡してレンダリングしたものを返す
     return render_template('setlist-edit.html', concert=concert, performances=performances, songs=songs, artists=artists)
 
 @app.route('/setlist-edit/<id>', methods=['POST'])
 def setlist_edit_update(id: str) -> Response:
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
     # リクエストされた POST パラメータの内容を取り出す
+    # （request.form は属性参照のたびにコンテキストを引くのでローカルへ退避）
+    form = request.form
     concert_id = id
-    number_of_order_str = request.form['number_of_order']
-    new_song_id_str = request.form['new_song_id']
-    song_id_str = request.form['song_id']
-    new_artist_id_str = request.form['new_artist_id']
-    artist_id_str = request.form['artist_id']
+    new_artist_id_str = form['new_artist_id']
 
-    try:
-        number_of_order = int(number_of_order_str)
-        new_song_id = int(new_song_id_str)
-        song_id = int(song_id_str)
-        artist_id = int(artist_id_str)
-    except ValueError:
+    values = parse_int_fields(form, 'number_of_order', 'new_song_id',
+                              'song_id', 'artist_id')
+    if values is None:
     # シリーズ通し番号が整数型へ変換できない
-        return redirect(url_for('setlist_edit_results',
-                    code='include-invalid-charactor'))
+        return redirect_results('setlist_edit_results', 'include-invalid-charactor')
+    number_of_order, new_song_id, song_id, artist_id = values
 
     if new_artist_id_str == 'delete':
         try:
-            cur.execute('DELETE FROM artists_performances WHERE concert_id = ? AND order_in_concert = ? AND artist_id = ?', (concert_id, number_of_order, artist_id))
-            con.commit()
+            # （自動コミットモードなので DELETE は実行と同時に確定する）
+            cur = con.execute(SQL_DELETE_PERFORMANCE_ARTIST,
+                              (concert_id, number_of_order, artist_id))
+            if cur.rowcount == 0:
+                # 対象行が存在しない（削除の再送など）ので何も変わっていない
+                return redirect_results('setlist_edit_results', 'unchanged')
 
             # 編集が終了したらトラック編集ページに戻りたかったが、結果ページへ戻すことにする
-            return redirect(url_for('setlist_edit_results',
-                                    code='updated'))
+            return redirect_results('setlist_edit_results', 'updated')
         except sqlite3.Error:
             # データベースエラーが発生
-            return redirect(url_for('setlist_edit_results',
-                                    code='database-error'))
-    try:
-        new_artist_id = int(new_artist_id_str)
-    except ValueError:
+            return redirect_results('setlist_edit_results', 'database-error')
+    values = parse_int_fields(form, 'new_artist_id')
+    if values is None:
     # シリーズ通し番号が整数型へ変換できない
-        return redirect(url_for('setlist_edit_results',
-                    code='include-invalid-charactor'))
+        return redirect_results('setlist_edit_results', 'include-invalid-charactor')
+    new_artist_id, = values
 
     # 変更がない場合編集画面にそのまま戻る
     if song_id == new_song_id and artist_id == new_artist_id:
-        return redirect(url_for('setlist_edit_results', code='unchanged'))
+        return redirect_results('setlist_edit_results', 'unchanged')
+
+    # 両方を変更する場合だけ 1 トランザクションに束ねる
+    # （片方だけの変更は自動コミットの単文で済み、BEGIN も COMMIT も不要）
+    both_changed = song_id != new_song_id and artist_id != new_artist_id
+    if both_changed:
+        con.execute('BEGIN IMMEDIATE')
     # 楽曲に変更があった場合
     if song_id != new_song_id:
         try:
             # performances テーブルの指定された行のパラメータを更新
-            cur.execute(
-            'UPDATE performances '
-            'SET song_id = ?'
-            'WHERE concert_id = ? AND number_of_order = ? '
-            , (new_song_id, concert_id, number_of_order))
+            con.execute(SQL_UPDATE_PERFORMANCE_SONG,
+                        (new_song_id, concert_id, number_of_order))
         except sqlite3.Error:
-                return redirect(url_for('setlist_edit_results',
-                                        code='database-error'))
+                return redirect_results('setlist_edit_results', 'database-error')
 
     # アーティストに変更があった場合
     if artist_id != new_artist_id:
         try:
-            # tracks テーブルの指定された行のパラメータを更新
-            cur.execute(
-            'UPDATE artists_performances '
-            'SET artist_id = ? '
-            'WHERE concert_id = ? AND order_in_concert = ? AND artist_id = ?'
-            , (new_artist_id, concert_id, number_of_order, artist_id))
+            # artists_performances テーブルの指定された行のパラメータを更新
+            con.execute(SQL_UPDATE_PERFORMANCE_ARTIST,
+                        (new_artist_id, concert_id, number_of_order, artist_id))
         except sqlite3.Error:
-            return redirect(url_for('setlist_edit_results',
-                            code='database-error'))
+            return redirect_results('setlist_edit_results', 'database-error')
             # return render_template('index.html')
 
-    con.commit()
+    if both_changed:
+        con.commit()
 
     # 編集対象の CD 情報をテンプレートへ渡してレンダリングしたものを返す
-    return redirect(url_for('setlist_edit_results',
-                            code='updated'))
+    return redirect_results('setlist_edit_results', 'updated')
 
 
 @app.route('/setlist-edit-results/<code>')
 def setlist_edit_results(code: str) -> str:
-    return render_template('setlist-edit-results.html',
-                           results=RESULT_MESSAGES.get(code, 'code error'))
+    return render_results_page('setlist-edit-results.html', code)
 
 
 @app.route('/performance-artist-edit/<id>/<number_of_order>')
 def performance_artist_edit(id: str, number_of_order:str) -> str:
 
     con = get_db()
-    cur = con.cursor()
 
-    artists = cur.execute('SELECT * FROM artists').fetchall()
-    performance = cur.execute('SELECT concert_id, number_of_order FROM performances WHERE concert_id = ? AND number_of_order = ? ', (id, number_of_order,)).fetchone()
+    artists = cached_fetchall(SQL_SELECT_ARTISTS_ALL, (), 'artists')
+    performance = con.execute(SQL_SELECT_PERFORMANCE,
+                              (id, number_of_order)).fetchone()
 
     # 編集対象の CD 情報をテンプレートへ渡してレンダリングしたものを返す
     return render_template('performance-artist-edit.html', concert_id=id, performance=performance, artists=artists)
 
 @app.route('/performance-artist-edit/<id>/<number_of_order>', methods=['POST'])
 def performance_artist_edit_update(id: str, number_of_order:str) -> Response:
-    # データベース接続してカーソルを得る
+    # データベース接続を得る
     con = get_db()
-    cur = con.cursor()
 
     # リクエストされた POST パラメータの内容を取り出す
     concert_id = id
-    artist_id_str = request.form['artist_id']
-    number_of_order_str = request.form['number_of_order']
 
-    try:
-        # 文字列型で渡されたシリーズ通し番号を整数型へ変換する
-        number_of_order = int(number_of_order_str)
-        artist_id = int(artist_id_str)
-    except ValueError:
+    # 文字列型で渡されたシリーズ通し番号を整数型へ変換する
+    values = parse_int_fields(request.form, 'number_of_order', 'artist_id')
+    if values is None:
     # シリーズ通し番号が整数型へ変換できない
-        return redirect(url_for('setlist_edit_results',
-                    code='include-invalid-charactor'))
-
-    track_artist = cur.execute('SELECT * FROM artists_performances WHERE concert_id = ? AND order_in_concert = ? AND artist_id = ?',
-                           (concert_id, number_of_order, artist_id,)).fetchone()
-    if track_artist is not None:
-        return redirect(url_for('setlist_edit_results',
-                                code='performance-artist-already-exists'))
+        return redirect_results('setlist_edit_results', 'include-invalid-charactor')
+    number_of_order, artist_id = values
 
     try:
-        # cds テーブルに指定されたパラメータの行を挿入
-        cur.execute('INSERT INTO artists_performances '
-                    '(concert_id, order_in_concert, artist_id) '
-                    'VALUES (?, ?, ?)',
-                    (concert_id, number_of_order, artist_id))
+        # artists_performances テーブルに行を挿入
+        # （INSERT OR IGNORE なら重複チェックと挿入が 1 文で済む）
+        cur = con.execute(SQL_INSERT_PERFORMANCE_ARTIST,
+                          (concert_id, number_of_order, artist_id))
     except sqlite3.Error:
         # データベースエラーが発生
-        return redirect(url_for('setlist_edit_results',
-                                code='database-error'))
-    # コミット（データベース更新処理を確定）
-    con.commit()
+        return redirect_results('setlist_edit_results', 'database-error')
+    if cur.rowcount == 0:
+        # 同じ組み合わせの行が既に存在（IGNORE で何も挿入されなかった）
+        return redirect_results('setlist_edit_results', 'performance-artist-already-exists')
 
     # 編集が終了したらトラック編集ページに戻りたかったが、結果ページへ戻すことにする
-    return redirect(url_for('setlist_edit_results',
-                            code='updated'))
+    return redirect_results('setlist_edit_results', 'updated')
 
 
 
 if __name__ == '__main__':
-    # このスクリプトを直接実行したらデバッグ用 Web サーバで起動する
-    app.run(debug=True)
\ No newline at end of file
+    # このスクリプトを直接実行したら開発用 Web サーバで起動する。
+    # デバッグモードは FLASK_DEBUG=1 のときだけ有効にする
+    # （本番は gunicorn 等の WSGI サーバで app:app を起動する）
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1')
\ No newline at end of file